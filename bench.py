@@ -0,0 +1,322 @@
+"""Benchmarks for the portfolio generator on synthetic content at several scales."""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from types import ModuleType
+
+import yaml
+
+import generate
+
+resource: ModuleType | None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+RESULTS_VERSION = 1
+SAMPLE_IMAGES = Path(__file__).resolve().parent / 'data' / 'images'
+SCALES = {
+    'small': {'experience': 5, 'highlights': 4, 'projects': 10, 'tags': 4,
+              'skills': 6, 'items': 4, 'images': 10},
+    'medium': {'experience': 50, 'highlights': 8, 'projects': 200, 'tags': 6,
+               'skills': 20, 'items': 6, 'images': 50},
+    'huge': {'experience': 1000, 'highlights': 10, 'projects': 5000, 'tags': 8,
+             'skills': 100, 'items': 10, 'images': 200},
+}
+STAGES = ('load_content', 'render_html', 'copy_assets', 'build', 'rebuild')
+WORDS = ('test', 'platform', 'factory', 'python', 'automation', 'yield', 'sensor',
+         'pipeline', 'firmware', 'calibration', 'fixture', 'release', 'station',
+         'validation', 'hardware', 'data', 'production', 'radio', 'network', 'parser')
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def synthetic_content(experience: int, highlights: int, projects: int, tags: int,
+                      skills: int, items: int, images: int, seed: int = 0) -> dict:
+    """Build portfolio content with the same shape as data/content.yaml.
+
+    Args:
+        experience: Number of experience entries.
+        highlights: Highlights per experience entry.
+        projects: Number of projects; every fourth one is featured.
+        tags: Tags per project, drawn from a pool of 50.
+        skills: Number of skill categories.
+        items: Items per skill category.
+        images: Number of distinct project images, shared round-robin.
+        seed: Random seed, so a scale always produces the same content.
+
+    Returns:
+        Content dictionary ready to be dumped as YAML.
+    """
+    rng = random.Random(seed)
+    tag_pool = [f'{rng.choice(WORDS).title()} {n}' for n in range(50)]
+    return {
+        'profile': {
+            'name': 'Synthetic Person',
+            'title': 'Benchmark Engineer',
+            'tagline': _sentence(rng, 12),
+            'photo': 'images/photo.jpg',
+            'resume': 'resume.pdf',
+            'location': 'Somewhere, MA',
+            'bio': ' '.join(_sentence(rng, 20) for _ in range(4)),
+        },
+        'contact': {'email': 'person@example.com', 'phone': '(555) 555-0100',
+                    'linkedin': 'in/synthetic', 'github': 'synthetic',
+                    'website': 'example.com'},
+        'skills': [{'category': f'Category {n}',
+                    'items': [_sentence(rng, 3).rstrip('.') for _ in range(items)]}
+                   for n in range(skills)],
+        'experience': [{'title': f'Engineer {n}', 'company': f'Company {n % 97}',
+                        'location': 'Boston, MA', 'period': f'{2000 + n % 25} - Present',
+                        'highlights': [_sentence(rng, 25) for _ in range(highlights)]}
+                       for n in range(experience)],
+        'projects': [{'title': f'Project {n}', 'url': f'https://example.com/{n}',
+                      'description': _sentence(rng, 35), 'image': f'project-{n % images}.png',
+                      'tags': rng.sample(tag_pool, tags), 'period': f'{2010 + n % 15} - Present',
+                      'featured': n % 4 == 0}
+                     for n in range(projects)],
+        'education': {'degree': 'B.S. Benchmarking', 'institution': 'Synthetic University',
+                      'year': 2020},
+    }
+
+
+def write_content(data_dir: Path, scale: dict, seed: int = 0) -> Path:
+    """Write a synthetic content.yaml plus its images and resume to a directory.
+
+    Images are copies of the sample images in data/images, so the copy
+    and probe stages see realistic file sizes.
+
+    Returns:
+        Path of the written content.yaml.
+    """
+    images_dir = data_dir / 'images'
+    images_dir.mkdir(parents=True, exist_ok=True)
+    content = synthetic_content(**scale, seed=seed)
+    samples = sorted(path for path in SAMPLE_IMAGES.glob('*.png'))
+    for n in range(scale['images']):
+        shutil.copyfile(samples[n % len(samples)], images_dir / f'project-{n}.png')
+    shutil.copyfile(next(SAMPLE_IMAGES.glob('*.jpg')), images_dir / 'photo.jpg')
+    (data_dir / 'resume.pdf').write_bytes(b'%PDF-1.4\n' + b'0' * 100_000)
+    content_path = data_dir / 'content.yaml'
+    content_path.write_text(yaml.safe_dump(content, sort_keys=False), encoding='utf-8')
+    return content_path
+
+
+def _peak_rss() -> int | None:
+    """Peak resident set size of this process in bytes, where available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))]
+
+
+def _run_stage(stage: str, content_path: Path, repeat: int, images: bool) -> dict:
+    """Time one stage in a fresh worker process.
+
+    Runs in its own process so the peak RSS it reports belongs to this
+    stage alone. The working directory is a scratch directory holding the
+    generator's .cache, which is cleared before every run of the cold
+    stages (load_content, copy_assets and build). One untimed warm-up run
+    comes first, so template compilation and imports are not counted.
+
+    Returns:
+        Dictionary with per-run 'latencies' in seconds, the 'items' and
+        'bytes' each run processes, and 'baseline_rss'/'peak_rss'.
+    """
+    work_dir = Path(tempfile.mkdtemp(prefix='bench-'))
+    try:
+        os.chdir(work_dir)
+        data = generate.load_content(content_path)
+        data_dir = content_path.parent
+        assets = [(path, f'images/{path.name}') for path in sorted((data_dir / 'images').iterdir())]
+        cards = len(data.skills) + len(data.experience) + len(data.projects)
+        pages = generate.archive_pages(data)
+        rendered = (len(data.skills) + len(generate.index_projects(data))
+                    + len(data.experience[:generate.RECENT_EXPERIENCE])
+                    + sum(len(page['entries']) for page in pages))
+        sizes = {
+            'load_content': (cards, content_path.stat().st_size),
+            'render_html': (rendered, None),
+            'copy_assets': (len(assets), sum(source.stat().st_size for source, _ in assets)),
+            'build': (cards, None),
+            'rebuild': (cards, None),
+        }
+        baseline = _peak_rss()
+        latencies = []
+        for run in range(repeat + 1):
+            out_dir = work_dir / f'out-{run}'
+            if stage in ('load_content', 'copy_assets', 'build'):
+                shutil.rmtree(generate.CACHE_DIR, ignore_errors=True)
+            if stage == 'rebuild':
+                generate.build_site(content_path, work_dir / 'out', verbose=False,
+                                    responsive_images=images)
+            start = time.perf_counter()
+            if stage == 'load_content':
+                generate.load_content(content_path)
+            elif stage == 'render_html':
+                streams = [generate.render_html(data)]
+                streams += [generate.render_archive(data, page) for page in pages]
+                html_bytes = sum(len(chunk.encode('utf-8'))
+                                 for stream in streams for chunk in stream)
+                sizes['render_html'] = (rendered, html_bytes)
+            elif stage == 'copy_assets':
+                (out_dir / 'images').mkdir(parents=True)
+                generate.copy_assets(out_dir, assets, {'outputs': {}})
+            elif stage == 'build':
+                generate.build_site(content_path, out_dir, verbose=False, responsive_images=images)
+            else:
+                generate.build_site(content_path, work_dir / 'out', verbose=False,
+                                    responsive_images=images)
+            if run:
+                latencies.append(time.perf_counter() - start)
+            shutil.rmtree(out_dir, ignore_errors=True)
+        items, size = sizes[stage]
+        return {'latencies': latencies, 'items': items, 'bytes': size,
+                'baseline_rss': baseline, 'peak_rss': _peak_rss()}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def summarize(run: dict) -> dict:
+    """Reduce a stage's raw timings to latency percentiles and throughput."""
+    latencies = run['latencies']
+    median = percentile(latencies, 0.5)
+    summary = {
+        'runs': len(latencies),
+        'min_ms': min(latencies) * 1000,
+        'p50_ms': median * 1000,
+        'p90_ms': percentile(latencies, 0.9) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'items': run['items'],
+        'items_per_s': run['items'] / median if median else None,
+        'bytes': run['bytes'],
+        'bytes_per_s': run['bytes'] / median if run['bytes'] and median else None,
+        'peak_rss': run['peak_rss'],
+        'rss_growth': (run['peak_rss'] - run['baseline_rss']
+                       if run['peak_rss'] is not None else None),
+    }
+    return {key: round(value, 3) if isinstance(value, float) else value
+            for key, value in summary.items()}
+
+
+def run_benchmarks(scales: list, stages: list, repeat: int, images: bool = False) -> dict:
+    """Generate content for each scale and time every stage against it.
+
+    Args:
+        scales: Names of SCALES to run.
+        stages: Names of STAGES to run.
+        repeat: Timed runs per stage.
+        images: Include responsive image encoding in build stages.
+
+    Returns:
+        Results document, ready to save as JSON.
+    """
+    results: dict = {}
+    context = get_context('spawn')
+    with tempfile.TemporaryDirectory(prefix='bench-content-') as root:
+        for scale in scales:
+            content_path = write_content(Path(root) / scale, SCALES[scale])
+            results[scale] = {}
+            for stage in stages:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    run = pool.submit(_run_stage, stage, content_path, repeat, images).result()
+                results[scale][stage] = summarize(run)
+                row = results[scale][stage]
+                print(f"  {scale:<8}{stage:<14}p50 {row['p50_ms']:>10.2f} ms  "
+                      f"p90 {row['p90_ms']:>10.2f} ms  "
+                      f"{row['items_per_s'] or 0:>12,.0f} items/s  "
+                      f"peak RSS {(row['peak_rss'] or 0) / 2 ** 20:>8.1f} MiB")
+    return {
+        'version': RESULTS_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'scales': {scale: SCALES[scale] for scale in scales},
+        'results': results,
+    }
+
+
+def find_regressions(baseline: dict, current: dict, threshold: float) -> list:
+    """Compare median latencies against a baseline results document.
+
+    Args:
+        baseline: Earlier results from run_benchmarks.
+        current: New results from run_benchmarks.
+        threshold: Allowed slowdown as a fraction, e.g. 0.1 for 10%.
+
+    Returns:
+        List of (scale, stage, baseline p50 ms, current p50 ms) tuples for
+        every stage whose median got slower by more than the threshold.
+    """
+    regressions = []
+    for scale, stages in current['results'].items():
+        for stage, row in stages.items():
+            before = baseline.get('results', {}).get(scale, {}).get(stage)
+            if before and row['p50_ms'] > before['p50_ms'] * (1 + threshold):
+                regressions.append((scale, stage, before['p50_ms'], row['p50_ms']))
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmarks, save the results and check for regressions."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=list(SCALES),
+                        help='content scales to run (default: all)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help='stages to time (default: all)')
+    parser.add_argument('--repeat', type=generate.positive_int, default=5,
+                        help='timed runs per stage (default: %(default)s)')
+    parser.add_argument('--images', action='store_true',
+                        help='include responsive image encoding in the build stages')
+    parser.add_argument('--output', type=Path, default=Path('bench-results.json'),
+                        help='results file to write (default: %(default)s)')
+    parser.add_argument('--compare', type=Path,
+                        help='earlier results file to check for regressions against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='median slowdown that counts as a regression (default: %(default)s)')
+    parser.add_argument('--write-content', type=Path, metavar='DIR',
+                        help='only write synthetic content for the first scale to DIR')
+    args = parser.parse_args()
+    if args.write_content:
+        content_path = write_content(args.write_content, SCALES[args.scales[0]])
+        print(f'Wrote {args.scales[0]} content to {content_path}')
+        return
+    print(f"Benchmarking {', '.join(args.scales)} with {args.repeat} runs per stage...")
+    results = run_benchmarks(args.scales, args.stages, args.repeat, args.images)
+    args.output.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+    print(f'Results written to {args.output}')
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        regressions = find_regressions(baseline, results, args.threshold)
+        for scale, stage, before, after in regressions:
+            print(f'  REGRESSION {scale} {stage}: {before:.2f} ms -> {after:.2f} ms '
+                  f'(+{after / before - 1:.0%})')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions above {args.threshold:.0%} against {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
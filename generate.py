@@ -1,240 +1,1089 @@
 """Portfolio generator for my career portfolio."""
 
+import argparse
+import asyncio
+import contextlib
+import functools
+import gzip
+import hashlib
+import json
+import marshal
+import os
+import pickle
+import posixpath
+import re
 import shutil
-from pathlib import Path
+import sys
+import tarfile
+import threading
+import time
+import traceback
+import tracemalloc
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import MISSING, dataclass, fields
+from html import escape
+from multiprocessing import get_context
+from pathlib import Path, PurePosixPath
+from types import ModuleType
+from typing import Literal
 
 import yaml
 
+SafeLoader: type = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+fcntl: ModuleType | None
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import brotli  # type: ignore[import-untyped, import-not-found]
+except ImportError:
+    brotli = None
+
+try:
+    from zopfli import gzip as zopfli_gzip  # type: ignore[import-untyped, import-not-found]
+except ImportError:
+    zopfli_gzip = None
+
+Image: ModuleType | None
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+MANIFEST_VERSION = 1
+WRITE_BUFFER_SIZE = 1 << 16
+COPY_THREADS = 8
+WRITE_THREADS = 4
+BUILD_CONCURRENCY = 4
+FSYNC_MODES = ('none', 'files', 'full')
+GENERATIONS_KEPT = 2
+FICLONE = 0x40049409
+CONTENT_FILE = Path('data/content.yaml')
+DOCS_DIR = Path('docs')
+DELTA_LIST = 'delta.json'
+DELTA_ARCHIVE = 'delta.tar.gz'
+CACHE_DIR = Path('.cache')
+MANIFEST_DIR = CACHE_DIR / 'manifests'
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'templates'
+TEMPLATE_COMPILER_VERSION = '1'
+FRAGMENT_CACHE_ENTRIES = 2048
+FRAGMENT_STORE_SLACK = 2
+CONTENT_CACHE_VERSION = 1
+SITE_URL = 'https://arbowl.github.io/career-portfolio'
+CRITICAL_SELECTOR_PREFIXES = ('*', ':root', 'html', 'body', '#nav', '.nav-', '.search-',
+                              '.hero', '.btn', '.tagline', '.scroll-indicator')
+ICON_LINKS = [
+    {'rel': 'apple-touch-icon', 'type': '', 'sizes': f'{size}x{size}', 'href': f'apple-icon-{size}x{size}.png'}
+    for size in (57, 60, 72, 76, 114, 120, 144, 152, 180)
+] + [
+    {'rel': 'icon', 'type': 'image/png', 'sizes': '192x192', 'href': 'android-icon-192x192.png'},
+] + [
+    {'rel': 'icon', 'type': 'image/png', 'sizes': f'{size}x{size}', 'href': f'favicon-{size}x{size}.png'}
+    for size in (32, 96, 16)
+]
+TILE_IMAGE = 'ms-icon-144x144.png'
+ICON_SIZES = {
+    'apple-touch-icon': (57, 60, 72, 76, 114, 120, 144, 152, 180),
+    'icon': (192, 32, 96, 16),
+    'tile': (144,),
+    'manifest': (36, 48, 72, 96, 144, 192),
+    'browserconfig': (70, 150, 310),
+}
+TILE_COLOR = '#ffffff'
+OG_IMAGE = 'og-default.png'
+WEB_MANIFEST = 'manifest.json'
+BROWSERCONFIG = 'browserconfig.xml'
+ARCHIVE_PAGE_SIZE = 12
+RECENT_EXPERIENCE = 4
+ARCHIVES = {
+    'projects': {'title': 'All Projects', 'section_class': 'section section-alt',
+                 'grid': 'projects-grid'},
+    'experience': {'title': 'Earlier Experience', 'section_class': 'section',
+                   'grid': 'experience-timeline'},
+}
+SEARCH_INDEX = 'search-index.json'
+SEARCH_SCRIPT = 'search.js'
+SEARCH_INDEX_VERSION = 1
+SEARCH_STOPWORDS = frozenset({'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'is',
+                              'it', 'of', 'on', 'or', 'the', 'to', 'with'})
+FINGERPRINT_LENGTH = 10
+HEADERS_FILE = '_headers'
+NGINX_SNIPPET = '_nginx.conf'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+SHORT_CACHE_CONTROL = 'public, max-age=60, must-revalidate'
+IMAGE_DERIVATIVES: dict[str, dict] = {
+    'hero': {'widths': (200, 400, 600), 'sizes': '(max-width: 480px) 150px, 200px'},
+    'project': {'widths': (400, 800, 1200), 'sizes': '(max-width: 768px) 100vw, 600px'},
+}
+DERIVATIVE_QUALITY = {'avif': 55, 'webp': 78, 'jpeg': 82}
+DERIVATIVE_MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+COMPRESSIBLE_SUFFIXES = ('.html', '.css', '.js', '.json', '.xml', '.svg', '.txt')
+
+_TEMPLATE_TOKEN = re.compile(r'({{.*?}}|{%.*?%})', re.DOTALL)
+_TEMPLATE_BLOCK_LINE = re.compile(r'^[ \t]*({%[^\n]*?%})[ \t]*\n', re.MULTILINE)
+_JPEG_SOF_MARKERS = frozenset({0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                               0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF})
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_WHITESPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{}:;,>])\s*')
+_SEARCH_TOKEN = re.compile(r'[a-z0-9]+')
+_templates: dict = {}
+_template_digests: dict = {}
+_fragment_caches: dict = {}
+
+
+def _thread_io() -> tuple | None:
+    """Bytes read and written by the calling thread, or None off Linux."""
+    try:
+        with open('/proc/thread-self/io', 'rb') as f:
+            counters = dict(line.split(b':') for line in f.read().splitlines())
+    except OSError:
+        return None
+    return int(counters[b'rchar']), int(counters[b'wchar'])
+
+
+class BuildProfiler:
+    """Records wall time, CPU time, I/O and peak memory for build stages.
+
+    Stages may nest and may run concurrently on several threads. CPU time
+    and I/O are per thread (I/O counts read/write calls, so kernel-side
+    copies don't show up); memory is the peak of Python allocations
+    traced by tracemalloc while the stage was open, above what was
+    allocated when it started.
+
+    A disabled profiler records nothing and costs next to nothing, so
+    build code can always call stage().
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.stages: list[dict] = []
+        self._open: list[dict] = []
+        self._lock = threading.Lock()
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name: str, category: str = 'build', **args):
+        """Context manager timing one stage; args are stored with it."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._stage(name, category, args)
+
+    def add(self, record: dict) -> None:
+        """Add a stage recorded elsewhere, such as in a worker process."""
+        with self._lock:
+            self.stages.append(record)
+
+    def _fold_peak(self) -> None:
+        """Credit the peak since the last check to every open stage."""
+        peak = tracemalloc.get_traced_memory()[1]
+        for record in self._open:
+            record['peak'] = max(record['peak'], peak)
+        tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def _stage(self, name: str, category: str, args: dict):
+        record: dict = {'name': name, 'category': category, 'pid': os.getpid(),
+                        'tid': threading.get_native_id(), 'args': args}
+        with self._lock:
+            self._fold_peak()
+            record['peak'] = record['base'] = tracemalloc.get_traced_memory()[0]
+            self._open.append(record)
+        io = _thread_io()
+        cpu = time.thread_time()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['wall'] = time.perf_counter() - start
+            record['cpu'] = time.thread_time() - cpu
+            record['start'] = start
+            end_io = _thread_io()
+            record['read'], record['written'] = (
+                (end_io[0] - io[0], end_io[1] - io[1]) if io and end_io else (None, None))
+            with self._lock:
+                self._fold_peak()
+                self._open.remove(record)
+                record['memory_peak'] = record.pop('peak') - record.pop('base')
+                self.stages.append(record)
+
+
+NULL_PROFILER = BuildProfiler(enabled=False)
+
+
+def _profiled_call(name: str, category: str, args: dict, function, *function_args) -> tuple:
+    """Run a function under a fresh profiler in a worker process.
+
+    Returns:
+        Tuple of (the function's result, its stage record).
+    """
+    profiler = BuildProfiler()
+    with profiler.stage(name, category, **args):
+        result = function(*function_args)
+    return result, profiler.stages[0]
+
+
+def write_profile(path: Path, runs: dict) -> Path:
+    """Write build profiles as a JSON summary and a Chrome trace.
+
+    The trace (PATH with a .trace.json suffix) loads in chrome://tracing
+    or Perfetto, with one process row per run and one track per thread.
+
+    Args:
+        path: JSON summary file to write.
+        runs: Map of run label (a tenant name, or the output directory)
+            to the stage records of its BuildProfiler.
+
+    Returns:
+        Path of the trace file.
+    """
+    starts = [stage['start'] for stages in runs.values() for stage in stages]
+    origin = min(starts, default=0)
+    summary = {}
+    events = []
+    for index, (label, stages) in enumerate(sorted(runs.items())):
+        stages = sorted(stages, key=lambda stage: stage['start'])
+        summary[label] = {
+            'seconds': round(max((s['start'] + s['wall'] for s in stages), default=origin)
+                             - min((s['start'] for s in stages), default=origin), 6),
+            'stages': [{**stage, 'start': round(stage['start'] - origin, 6),
+                        'wall': round(stage['wall'], 6), 'cpu': round(stage['cpu'], 6)}
+                       for stage in stages],
+        }
+        events.append({'name': 'process_name', 'ph': 'M', 'pid': index, 'args': {'name': label}})
+        for stage in stages:
+            events.append({
+                'name': stage['name'], 'cat': stage['category'], 'ph': 'X', 'pid': index,
+                'tid': stage['tid'], 'ts': round((stage['start'] - origin) * 1e6, 1),
+                'dur': round(stage['wall'] * 1e6, 1),
+                'args': {'cpu_ms': round(stage['cpu'] * 1000, 3), 'read': stage['read'],
+                         'written': stage['written'], 'memory_peak': stage['memory_peak'],
+                         **stage['args']},
+            })
+    path.write_text(json.dumps(summary, indent=2, default=str) + '\n', encoding='utf-8')
+    trace_path = path.with_suffix('.trace.json')
+    trace_path.write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, default=str),
+                          encoding='utf-8')
+    return trace_path
+
+
+def print_profile(stages: list, limit: int = 15) -> None:
+    """Print the slowest stages of a build."""
+    print(f"  {'stage':<40}{'wall ms':>10}{'cpu ms':>10}{'read':>12}{'written':>12}{'peak mem':>12}")
+    for stage in sorted(stages, key=lambda stage: -stage['wall'])[:limit]:
+        io = ''.join(f"{'-' if stage[key] is None else f'{stage[key]:,}':>12}" for key in ('read', 'written'))
+        print(f"  {stage['name'][:39]:<40}{stage['wall'] * 1000:>10.2f}{stage['cpu'] * 1000:>10.2f}"
+              f"{io}{stage['memory_peak']:>12,}")
+
+
+class ContentError(Exception):
+    """Raised when a content file doesn't match the content model."""
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    """Who the portfolio is about."""
+
+    name: str
+    title: str
+    tagline: str
+    photo: str
+    bio: str
+    location: str
+    icon: str | None = None
+    resume: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Contact:
+    """Contact details shown in the about and contact sections."""
+
+    email: str
+    phone: str
+    linkedin: str
+    github: str
+    website: str
+
+
+@dataclass(frozen=True, slots=True)
+class SkillCategory:
+    """One skill card: a category and its items."""
+
+    category: str
+    items: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Experience:
+    """One job, newest first in Content.experience."""
+
+    title: str
+    company: str
+    location: str
+    period: str
+    highlights: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    """One project card."""
+
+    title: str
+    url: str
+    description: str
+    period: str
+    image: str | None = None
+    tags: tuple[str, ...] = ()
+    featured: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Education:
+    """The degree shown in the footer."""
+
+    degree: str
+    institution: str
+    year: str
+
+
+@dataclass(frozen=True, slots=True)
+class Content:
+    """All portfolio content, as validated from content.yaml."""
+
+    profile: Profile
+    contact: Contact
+    skills: tuple[SkillCategory, ...]
+    experience: tuple[Experience, ...]
+    projects: tuple[Project, ...]
+    education: Education
+
+
+def _record(cls, raw, where: str, **nested):
+    """Validate one YAML mapping into a record of type cls.
+
+    Scalar fields are stored as strings, since YAML reads a year or a
+    phone number as a number. String-list fields become tuples of
+    interned strings, so tags and skills repeated across entries (or
+    across tenants in a batch worker) are stored once. nested maps field
+    names to functions converting their raw values.
+    """
+    if not isinstance(raw, dict):
+        raise ContentError(f'{where or "top level"}: expected a mapping, got {type(raw).__name__}')
+    known = {field.name: field for field in fields(cls)}
+    unknown = sorted(str(name) for name in raw.keys() - known.keys())
+    if unknown:
+        raise ContentError(f"{where or 'top level'}: unknown key {', '.join(map(repr, unknown))}")
+    missing = [name for name, field in known.items()
+               if field.default is MISSING and raw.get(name) is None]
+    if missing:
+        raise ContentError(f"{where or 'top level'}: missing required key "
+                           f"{', '.join(map(repr, missing))}")
+    values = {}
+    for name, value in raw.items():
+        path = f'{where}.{name}' if where else name
+        if value is None:
+            continue
+        if name in nested:
+            value = nested[name](value, path)
+        elif known[name].type is bool:
+            if not isinstance(value, bool):
+                raise ContentError(f'{path}: expected true or false, got {value!r}')
+        elif known[name].type == tuple[str, ...]:
+            value = tuple(sys.intern(str(item)) for item in _list(value, path))
+        elif isinstance(value, (dict, list)):
+            raise ContentError(f'{path}: expected a single value, got {type(value).__name__}')
+        else:
+            value = str(value)
+        values[name] = value
+    return cls(**values)
+
+
+def _list(value, where: str) -> list:
+    if not isinstance(value, list):
+        raise ContentError(f'{where}: expected a list, got {type(value).__name__}')
+    return value
+
+
+def _records(cls):
+    """Converter for a field holding a list of cls records."""
+    return lambda value, where: tuple(_record(cls, item, f'{where}[{index}]')
+                                      for index, item in enumerate(_list(value, where)))
+
+
+def parse_content(raw, source: str = '<content>') -> Content:
+    """Validate parsed YAML into the typed content model.
+
+    Args:
+        raw: Parsed YAML document.
+        source: File name to start error messages with.
+
+    Returns:
+        Content record.
+
+    Raises:
+        ContentError: Naming the file, the entry and the problem, for
+            example "content.yaml: projects[2]: missing required key 'url'".
+    """
+    try:
+        return _record(Content, raw, '',
+                       profile=lambda value, where: _record(Profile, value, where),
+                       contact=lambda value, where: _record(Contact, value, where),
+                       skills=_records(SkillCategory),
+                       experience=_records(Experience),
+                       projects=_records(Project),
+                       education=lambda value, where: _record(Education, value, where))
+    except ContentError as e:
+        raise ContentError(f'{source}: {e}') from None
+
+
+def load_content(path: Path = CONTENT_FILE) -> Content:
+    """Load content from a content.yaml file.
+
+    Args:
+        path: YAML file to load.
+
+    Returns:
+        Content record with all portfolio content.
+
+    Raises:
+        ContentError: If the file doesn't match the content model.
+    """
+    return load_content_cached(path)[0]
+
+
+def load_content_cached(path: Path) -> tuple:
+    """Load a content file, reusing the parsed result when it is unchanged.
+
+    Parsed YAML is pickled under the cache directory together with the
+    file's size, mtime and SHA-256. A matching size and mtime reuses the
+    cached document without reading the file; otherwise a matching hash
+    still avoids re-parsing (for example after a touch or a checkout).
+    The document is validated into a Content record on every load, which
+    is cheap next to parsing.
+
+    Args:
+        path: YAML file to load.
+
+    Returns:
+        Tuple of (Content record, SHA-256 hex digest of the file).
+
+    Raises:
+        ContentError: If the file doesn't match the content model.
+    """
+    stat = path.stat()
+    cache_path = CACHE_DIR / 'content' / f'{text_digest(str(path.resolve()))}.pickle'
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached['version'] != CONTENT_CACHE_VERSION:
+            cached = None
+    except (OSError, EOFError, pickle.UnpicklingError, KeyError, TypeError, AttributeError):
+        cached = None
+    if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+        return parse_content(cached['data'], str(path)), cached['hash']
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached and cached['hash'] == digest:
+        data = cached['data']
+    else:
+        data = yaml.load(raw, Loader=SafeLoader)
+    entry = {
+        'version': CONTENT_CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': digest,
+        'data': data,
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_name(f'.{cache_path.name}.{os.getpid()}.tmp')
+        with open(temp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+    return parse_content(data, str(path)), digest
+
+
+class TemplateError(Exception):
+    """Raised when a template cannot be compiled."""
+
+
+def _lookup(obj, key: str):
+    """Resolve one step of a dotted template expression."""
+    if isinstance(obj, dict):
+        return obj[key]
+    return getattr(obj, key)
+
+
+def _escape(value) -> str:
+    """Escape a template value for use in HTML text or attributes."""
+    return escape(value if isinstance(value, str) else str(value))
+
+
+def compile_template(source: str, name: str = '<template>'):
+    """Compile template source into Python code.
+
+    The template language is deliberately small:
+
+    - ``{{ a.b }}`` inserts a value, HTML-escaped;
+    - ``{{ a.b|safe }}`` inserts a value verbatim;
+    - ``{% for x in a.b %}`` ... ``{% endfor %}`` loops;
+    - ``{% if a.b %}`` ... ``{% else %}`` ... ``{% endif %}`` branches.
+
+    Dotted names resolve dictionary keys or attributes. A line holding only
+    a block tag is dropped entirely, so tags don't leave blank lines behind.
+    Escaping happens per value while rendering, never as a pass over the
+    output.
+
+    Args:
+        source: Template text.
+        name: Template name used in error messages and tracebacks.
 
-def load_content() -> dict:
-    """Load content from content.yaml file."""
-    with open('data/content.yaml', 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    Returns:
+        Code object defining a generator function ``render(_ctx)`` that
+        yields the rendered text in pieces.
+
+    Raises:
+        TemplateError: If the template is malformed.
+    """
+    source = _TEMPLATE_BLOCK_LINE.sub(r'\1', source)
+    lines = ['def render(_ctx):', '    pass']
+    blocks: list[str] = []
+    loop_vars = []
+    pending: list[str] = []
+
+    def expression(text: str) -> str:
+        head, *attrs = text.strip().split('.')
+        if not head.isidentifier() or not all(a.isidentifier() for a in attrs):
+            raise TemplateError(f'{name}: invalid expression {text.strip()!r}')
+        code = head if head in loop_vars else f'_ctx[{head!r}]'
+        for attr in attrs:
+            code = f'_lookup({code}, {attr!r})'
+        return code
+
+    def emit(statement: str) -> None:
+        if pending:
+            parts = ', '.join(pending)
+            value = pending[0] if len(pending) == 1 else f"''.join(({parts},))"
+            lines.append('    ' * (len(blocks) + 1) + f'yield {value}')
+            pending.clear()
+        if statement:
+            lines.append('    ' * (len(blocks) + 1) + statement)
+
+    for token in _TEMPLATE_TOKEN.split(source):
+        if token.startswith('{{'):
+            inner = token[2:-2].strip()
+            if inner.endswith('|safe'):
+                pending.append(f'str({expression(inner[:-5])})')
+            else:
+                pending.append(f'_escape({expression(inner)})')
+        elif token.startswith('{%'):
+            words = token[2:-2].split()
+            keyword = words[0] if words else ''
+            if keyword == 'for' and len(words) == 4 and words[2] == 'in':
+                if not words[1].isidentifier():
+                    raise TemplateError(f'{name}: invalid loop variable {words[1]!r}')
+                emit(f'for {words[1]} in {expression(words[3])}:')
+                blocks.append('for')
+                loop_vars.append(words[1])
+                emit('pass')
+            elif keyword == 'if' and len(words) == 2:
+                emit(f'if {expression(words[1])}:')
+                blocks.append('if')
+                emit('pass')
+            elif keyword == 'else' and blocks and blocks[-1] == 'if':
+                emit('')
+                blocks[-1] = 'else'
+                lines.append('    ' * len(blocks) + 'else:')
+                emit('pass')
+            elif keyword == 'endfor' and blocks and blocks[-1] == 'for':
+                emit('')
+                blocks.pop()
+                loop_vars.pop()
+            elif keyword == 'endif' and blocks and blocks[-1] in ('if', 'else'):
+                emit('')
+                blocks.pop()
+            else:
+                raise TemplateError(f'{name}: unexpected tag {token!r}')
+        elif token:
+            pending.append(repr(token))
+    if blocks:
+        raise TemplateError(f'{name}: unclosed {{% {blocks[-1]} %}} block')
+    emit('')
+    return compile('\n'.join(lines), f'<template {name}>', 'exec')
+
+
+def load_template(name: str):
+    """Load a compiled template, parsing it at most once.
+
+    Compiled templates are cached in memory for the life of the process
+    and on disk under the cache directory, keyed by a hash of the
+    template source, so batch workers and later builds skip parsing.
+
+    Args:
+        name: Template file name inside the templates directory.
+
+    Returns:
+        Generator function taking a context dictionary.
+    """
+    template = _templates.get(name)
+    if template is not None:
+        return template
+    source = (TEMPLATE_DIR / name).read_text(encoding='utf-8')
+    if source.endswith('\n'):
+        source = source[:-1]
+    key = text_digest(TEMPLATE_COMPILER_VERSION, sys.implementation.cache_tag, source)
+    cache_path = CACHE_DIR / 'templates' / f'{key}.marshal'
+    try:
+        code = marshal.loads(cache_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        code = compile_template(source, name)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_name(f'.{key}.{os.getpid()}.tmp')
+            temp_path.write_bytes(marshal.dumps(code))
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+    namespace = {'_lookup': _lookup, '_escape': _escape}
+    exec(code, namespace)
+    template = _templates[name] = namespace['render']
+    _template_digests[name] = key
+    return template
+
+
+def render_template(name: str, context: dict) -> Iterator[str]:
+    """Render a template as a stream of text fragments.
 
+    Args:
+        name: Template file name inside the templates directory.
+        context: Values available to the template.
+
+    Returns:
+        Iterator over the rendered pieces.
+    """
+    return load_template(name)(context)
 
-def generate_html(data: dict) -> str:
+
+def generate_html(data: Content) -> str:
     """Generate HTML for the portfolio site.
 
     Args:
-        data: Dictionary containing all portfolio content from YAML.
+        data: Portfolio content from load_content.
 
     Returns:
         Complete HTML document as a string.
     """
-    profile = data['profile']
-    contact = data['contact']
-    skills = data['skills']
-    experience = data['experience']
-    projects = data['projects']
-    education = data['education']
-    featured_projects = [p for p in projects if p.get('featured', False)]
-    photo_filename = Path(profile['photo']).name
-    site_url = "https://arbowl.github.io/career-portfolio"
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="{profile['tagline']}">
-    <title>{profile['name']} - {profile['title']}</title>
-    <meta property="og:title" content="{profile['name']} - {profile['title']}">
-    <meta property="og:description" content="{profile['tagline']}">
-    <meta property="og:image" content="{site_url}/images/og-default.png">
-    <meta property="og:url" content="{site_url}">
-    <meta property="og:type" content="website">
-    <meta name="twitter:card" content="summary_large_image">
-    <meta name="twitter:title" content="{profile['name']} - {profile['title']}">
-    <meta name="twitter:description" content="{profile['tagline']}">
-    <meta name="twitter:image" content="{site_url}/images/og-default.png">
-    <link rel="apple-touch-icon" sizes="57x57" href="images/apple-icon-57x57.png">
-    <link rel="apple-touch-icon" sizes="60x60" href="images/apple-icon-60x60.png">
-    <link rel="apple-touch-icon" sizes="72x72" href="images/apple-icon-72x72.png">
-    <link rel="apple-touch-icon" sizes="76x76" href="images/apple-icon-76x76.png">
-    <link rel="apple-touch-icon" sizes="114x114" href="images/apple-icon-114x114.png">
-    <link rel="apple-touch-icon" sizes="120x120" href="images/apple-icon-120x120.png">
-    <link rel="apple-touch-icon" sizes="144x144" href="images/apple-icon-144x144.png">
-    <link rel="apple-touch-icon" sizes="152x152" href="images/apple-icon-152x152.png">
-    <link rel="apple-touch-icon" sizes="180x180" href="images/apple-icon-180x180.png">
-    <link rel="icon" type="image/png" sizes="192x192" href="images/android-icon-192x192.png">
-    <link rel="icon" type="image/png" sizes="32x32" href="images/favicon-32x32.png">
-    <link rel="icon" type="image/png" sizes="96x96" href="images/favicon-96x96.png">
-    <link rel="icon" type="image/png" sizes="16x16" href="images/favicon-16x16.png">
-    <link rel="manifest" href="images/manifest.json">
-    <meta name="msapplication-TileColor" content="#1a3a52">
-    <meta name="msapplication-TileImage" content="images/ms-icon-144x144.png">
-    <meta name="theme-color" content="#1a3a52">
-    <link rel="stylesheet" href="style.css">
-</head>
-<body>
-    <nav id="nav">
-        <div class="nav-content">
-            <a href="#top" class="nav-brand">{profile['name']}</a>
-            <div class="nav-links">
-                <a href="#about">About</a>
-                <a href="#skills">Skills</a>
-                <a href="#experience">Experience</a>
-                <a href="#projects">Projects</a>
-                <a href="#contact">Contact</a>
-            </div>
-        </div>
-    </nav>
-
-    <section id="top" class="hero">
-        <div class="hero-content">
-            <div class="hero-image">
-                <img src="images/{photo_filename}" alt="{profile['name']}">
-            </div>
-            <h1>{profile['name']}</h1>
-            <h2>{profile['title']}</h2>
-            <p class="tagline">{profile['tagline']}</p>
-            <div class="hero-links">
-                <a href="mailto:{contact['email']}" class="btn">Email</a>
-                <a href="{profile.get('resume', '#')}" class="btn btn-secondary" download>Resume</a>
-                <a href="https://github.com/{contact['github']}" class="btn btn-secondary" target="_blank">GitHub</a>
-                <a href="https://linkedin.com/{contact['linkedin']}" class="btn btn-secondary" target="_blank">LinkedIn</a>
-            </div>
-            <a href="#about" class="scroll-indicator">↓</a>
-        </div>
-    </section>
-
-    <section id="about" class="section">
-        <div class="container">
-            <h2 class="section-title">About</h2>
-            <div class="about-content">
-                <p class="bio">{profile['bio']}</p>
-                <div class="about-meta">
-                    <div class="meta-item">
-                        <span class="meta-label">Location</span>
-                        <span class="meta-value">{profile['location']}</span>
-                    </div>
-                    <div class="meta-item">
-                        <span class="meta-label">Email</span>
-                        <span class="meta-value">{contact['email']}</span>
-                    </div>
-                    <div class="meta-item">
-                        <span class="meta-label">Phone</span>
-                        <span class="meta-value">{contact['phone']}</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <section id="skills" class="section section-alt">
-        <div class="container">
-            <h2 class="section-title">Skills</h2>
-            <div class="skills-grid">'''
-    for skill_cat in skills:
-        html += f'''
-                <div class="skill-card">
-                    <h3>{skill_cat['category']}</h3>
-                    <ul class="skill-list">'''
-        for item in skill_cat['items']:
-            html += f'''
-                        <li>{item}</li>'''
-        html += '''
-                    </ul>
-                </div>'''
-    html += '''
-            </div>
-        </div>
-    </section>
-
-    <section id="experience" class="section">
-        <div class="container">
-            <h2 class="section-title">Experience</h2>
-            <div class="experience-timeline">'''
-    for exp in experience:
-        html += f'''
-                <div class="experience-card">
-                    <div class="experience-header">
-                        <div>
-                            <h3>{exp['title']}</h3>
-                            <p class="company">{exp['company']} - {exp['location']}</p>
-                        </div>
-                        <span class="period">{exp['period']}</span>
-                    </div>
-                    <ul class="highlights">'''
-        for highlight in exp['highlights']:
-            html += f'''
-                        <li>{highlight}</li>'''
-        html += '''
-                    </ul>
-                </div>'''
-    html += '''
-            </div>
-        </div>
-    </section>
-
-    <section id="projects" class="section section-alt">
-        <div class="container">
-            <h2 class="section-title">Featured Projects</h2>
-            <div class="projects-grid">'''
-    for project in featured_projects:
-        tags_html = ' '.join([f'<span class="tag">{tag}</span>' for tag in project.get('tags', [])])
-        image_html = ''
-        if 'image' in project and project['image']:
-            image_html = f'''
-                    <div class="project-image">
-                        <img src="images/{project['image']}" alt="{project['title']}">
-                    </div>'''
-        html += f'''
-                <div class="project-card">{image_html}
-                    <div class="project-header">
-                        <h3>{project['title']}</h3>
-                        <span class="period">{project['period']}</span>
-                    </div>
-                    <p class="project-description">{project['description']}</p>
-                    <div class="project-tags">{tags_html}</div>
-                    <a href="{project['url']}" class="project-link" target="_blank">View Project →</a>
-                </div>'''
-    html += f'''
-            </div>
-        </div>
-    </section>
-
-    <section id="contact" class="section">
-        <div class="container">
-            <h2 class="section-title">Get In Touch</h2>
-            <div class="contact-content">
-                <p>I'm always interested in discussing test automation, manufacturing software, or civic technology projects.</p>
-                <div class="contact-links">
-                    <a href="mailto:{contact['email']}" class="contact-link">
-                        <span class="contact-label">Email</span>
-                        <span class="contact-value">{contact['email']}</span>
-                    </a>
-                    <a href="https://github.com/{contact['github']}" class="contact-link" target="_blank">
-                        <span class="contact-label">GitHub</span>
-                        <span class="contact-value">github.com/{contact['github']}</span>
-                    </a>
-                    <a href="https://linkedin.com/{contact['linkedin']}" class="contact-link" target="_blank">
-                        <span class="contact-label">LinkedIn</span>
-                        <span class="contact-value">linkedin.com/{contact['linkedin']}</span>
-                    </a>
-                    <a href="https://{contact['website']}" class="contact-link" target="_blank">
-                        <span class="contact-label">Website</span>
-                        <span class="contact-value">{contact['website']}</span>
-                    </a>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <footer>
-        <div class="container">
-            <p>&copy; 2025 {profile['name']}. Built with Python, YAML, and minimal dependencies.</p>
-            <p class="footer-education">{education['degree']} - {education['institution']} ({education['year']})</p>
-        </div>
-    </footer>
-
-    <button id="back-to-top" class="back-to-top" aria-label="Back to top">↑</button>
-
-    <script src="script.js"></script>
-</body>
-</html>'''
+    return ''.join(render_html(data))
+
+
+def render_html(data: Content, cache=None, critical_css: str = '',
+                images: dict | None = None, derivatives: dict | None = None,
+                urls: dict | None = None, icons: dict | None = None,
+                profiler: BuildProfiler | None = None,
+                page_size: int = ARCHIVE_PAGE_SIZE) -> Iterator[str]:
+    """Render the portfolio page as a stream of HTML fragments.
+
+    Fragments are yielded in document order so the page can be written
+    out as it is produced, without holding the whole document in memory.
+    The page shows at most page_size featured projects and the
+    RECENT_EXPERIENCE most recent jobs, linking to the archive pages
+    (see archive_pages) for the rest, so its size doesn't grow with the
+    content.
+
+    Args:
+        data: Portfolio content from load_content.
+        cache: Optional fragment cache (see render_fragment). When given,
+            sections and cards whose inputs are unchanged are reused
+            instead of being rendered again.
+        critical_css: Above-the-fold CSS to inline in the head. When set,
+            the full stylesheet is loaded without blocking rendering.
+        images: Intrinsic sizes of the images in data/images, as returned
+            by probe_images. Images with a known size are emitted with
+            width and height attributes so they reserve their space.
+        derivatives: Responsive variants from derive_images. Images with
+            variants are emitted as <picture> elements with srcset.
+        urls: Map of output path to the (fingerprinted) path it is
+            published under. Paths not in the map are linked unchanged.
+        icons: Map of icon size to output path, from derive_icons. When
+            not given, the hand-made icon files in data/images are linked.
+        profiler: Optional BuildProfiler timing each section, including
+            the time the consumer spends writing it out.
+        page_size: Entries per archive page, which also caps the number of
+            featured projects on this page.
+
+    Yields:
+        Consecutive pieces of the HTML document.
+    """
+    context = _page_context(data, critical_css, images, derivatives, urls, icons)
+    projects = index_projects(data, page_size)
+    experience = data.experience[:RECENT_EXPERIENCE]
+    archives = {page['kind']: page for page in archive_pages(data, page_size) if page['number'] == 1}
+    skill_cards = (render_fragment('skill_card.html', {'skill': skill}, cache)
+                   for skill in data.skills)
+    experience_cards = _cards('experience', experience, cache, images, derivatives, urls)
+    project_cards = _cards('projects', projects, cache, images, derivatives, urls)
+    stage = (profiler or NULL_PROFILER).stage
+    with stage('html head', 'html'):
+        yield from _render_section('head.html', context, cache)
+    yield '\n'
+    with stage('html nav', 'html'):
+        yield from _render_section('nav.html', context, cache)
+    yield '\n\n'
+    with stage('html hero', 'html'):
+        yield from _render_section('hero.html', context, cache)
+    yield '\n\n'
+    with stage('html about', 'html'):
+        yield from _render_section('about.html', context, cache)
+    yield '\n\n'
+    with stage('html skills', 'html', cards=len(data.skills)):
+        yield from render_template('skills.html', {'cards': skill_cards})
+    yield '\n\n'
+    with stage('html experience', 'html', cards=len(experience)):
+        yield from render_template('experience.html', {
+            'cards': experience_cards,
+            'archive': archives.get('experience') and {
+                'href': archives['experience']['name'],
+                'label': f'{len(data.experience) - len(experience)} earlier roles',
+            },
+        })
+    yield '\n\n'
+    with stage('html projects', 'html', cards=len(projects)):
+        yield from render_template('projects.html', {
+            'cards': project_cards,
+            'archive': archives.get('projects') and {
+                'href': archives['projects']['name'],
+                'label': f'All {len(data.projects)} projects',
+            },
+        })
+    yield '\n\n'
+    with stage('html contact', 'html'):
+        yield from _render_section('contact.html', context, cache)
+    yield '\n\n'
+    with stage('html footer', 'html'):
+        yield from _render_section('footer.html', context, cache)
+
+
+def _page_context(data: Content, critical_css: str, images: dict | None, derivatives: dict | None,
+                  urls: dict | None, icons: dict | None, base: str = '') -> dict:
+    """Build the template context shared by the index and the archive pages."""
+    profile = data.profile
+    images = images or {}
+    derivatives = derivatives or {}
+    urls = urls or {}
+
+    def url(name: str) -> str:
+        return urls.get(name, name)
+
+    photo = Path(profile.photo).name
+    icon_links, tile_image = icon_set(icons)
+    return {
+        'profile': profile,
+        'contact': data.contact,
+        'education': data.education,
+        'site_url': SITE_URL,
+        'base': base,
+        'icons': [{**icon, 'href': url(icon['href'])} for icon in icon_links],
+        'tile_image': url(tile_image),
+        'og_image': url(f'images/{OG_IMAGE}'),
+        'web_manifest': url(f'images/{WEB_MANIFEST}'),
+        'browserconfig': url(f'images/{BROWSERCONFIG}'),
+        'stylesheet': url('style.css'),
+        'script': url('script.js'),
+        'search': {'index': url(SEARCH_INDEX), 'script': url(SEARCH_SCRIPT)},
+        'photo': picture(photo, 'hero', images, derivatives, urls),
+        'resume': profile.resume or '#',
+        'critical_css': critical_css,
+    }
+
+
+def _cards(kind: str, entries: Iterable, cache, images: dict | None, derivatives: dict | None,
+           urls: dict | None) -> Iterator[str]:
+    """Render project or experience cards lazily, one fragment each."""
+    if kind == 'experience':
+        return (render_fragment('experience_card.html', {'job': job}, cache) for job in entries)
+    return (render_fragment('project_card.html', {
+        'project': project,
+        'image': project.image and picture(project.image, 'project', images or {},
+                                           derivatives or {}, urls),
+    }, cache) for project in entries)
+
+
+def index_projects(data: Content, page_size: int = ARCHIVE_PAGE_SIZE) -> list:
+    """The featured projects shown on the index page."""
+    return [p for p in data.projects if p.featured][:page_size]
+
+
+def archive_pages(data: Content, page_size: int = ARCHIVE_PAGE_SIZE) -> list:
+    """Split the entries the index page leaves out into archive pages.
+
+    The project archive lists every project and is only produced when
+    some project is missing from the index. The experience archive lists
+    the jobs after the RECENT_EXPERIENCE most recent ones.
+
+    Args:
+        data: Portfolio content from load_content.
+        page_size: Entries per page.
+
+    Returns:
+        List of dictionaries with 'name' (output path, e.g.
+        projects/page-2.html), 'kind', 'number', 'count' and 'entries'.
+    """
+    sources = {'projects': data.projects, 'experience': data.experience[RECENT_EXPERIENCE:]}
+    if len(index_projects(data, page_size)) == len(data.projects):
+        sources['projects'] = ()
+    pages = []
+    for kind, entries in sources.items():
+        chunks = [entries[start:start + page_size] for start in range(0, len(entries), page_size)]
+        pages += [{'name': f'{kind}/page-{number}.html', 'kind': kind, 'number': number,
+                   'count': len(chunks), 'entries': chunk}
+                  for number, chunk in enumerate(chunks, 1)]
+    return pages
+
+
+def render_archive(data: Content, page: dict, cache=None, critical_css: str = '',
+                   images: dict | None = None, derivatives: dict | None = None,
+                   urls: dict | None = None, icons: dict | None = None) -> Iterator[str]:
+    """Render one archive page as a stream of HTML fragments.
+
+    Archive pages live one directory down and set <base href="../">, so
+    every link on them, including the navigation anchors, resolves
+    against the site root exactly as it does on the index page.
+
+    Args:
+        data: Portfolio content from load_content.
+        page: One entry of archive_pages.
+        cache, critical_css, images, derivatives, urls, icons: As for
+            render_html.
+
+    Yields:
+        Consecutive pieces of the HTML document.
+    """
+    context = _page_context(data, critical_css, images, derivatives, urls, icons, base='../')
+    kind, number = page['kind'], page['number']
+    archive = {
+        **ARCHIVES[kind],
+        'kind': kind,
+        'number': number,
+        'count': page['count'],
+        'previous': number > 1 and f'{kind}/page-{number - 1}.html',
+        'next': number < page['count'] and f'{kind}/page-{number + 1}.html',
+        'cards': _cards(kind, page['entries'], cache, images, derivatives, urls),
+    }
+    yield from _render_section('head.html', context, cache)
+    yield '\n'
+    yield from _render_section('nav.html', context, cache)
+    yield '\n\n'
+    yield from render_template('archive.html', {'archive': archive})
+    yield '\n\n'
+    yield from _render_section('footer.html', context, cache)
+
+
+def render_fragment(name: str, context: dict, cache=None) -> str:
+    """Render a template to a string, reusing a cached copy if possible.
+
+    Cache keys combine the template name, a hash of its source and the
+    repr of the context, so editing either the content or the template
+    produces a new key.
+
+    Args:
+        name: Template file name inside the templates directory.
+        context: Values available to the template.
+        cache: Optional mapping-like object supporting ``get`` and item
+            assignment.
+
+    Returns:
+        Rendered text.
+    """
+    if cache is None:
+        return ''.join(render_template(name, context))
+    load_template(name)
+    key = f'{name}:{text_digest(_template_digests[name], repr(context))}'
+    html = cache.get(key)
+    if html is None:
+        html = cache[key] = ''.join(render_template(name, context))
     return html
 
 
+def _render_section(name: str, context: dict, cache) -> Iterable[str]:
+    """Stream a section, or fetch it whole from the fragment cache."""
+    if cache is None:
+        return render_template(name, context)
+    return (render_fragment(name, context, cache),)
+
+
+class FragmentCache:
+    """LRU cache of rendered fragments, optionally backed by a directory.
+
+    Implements the ``get``/item-assignment interface expected by
+    render_fragment. Keys already hash the template source and the
+    fragment's inputs, so a cached fragment never goes stale; entries
+    only leave memory to bound its size. With a store directory, every
+    rendered fragment is also written there (one file per key) and
+    misses are looked up on disk, so fragments survive the process and
+    are shared by every process using the same store. Each stored
+    fragment a build uses has its mtime bumped, so prune_fragment_store
+    can drop the ones no build uses any more. Safe to use from several
+    threads.
+    """
+
+    def __init__(self, max_entries: int = FRAGMENT_CACHE_ENTRIES,
+                 store: Path | None = None) -> None:
+        self.max_entries = max_entries
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._used: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        assert self.store is not None, 'only called with a store'
+        name, digest = key.split(':', 1)
+        return self.store / name / f'{digest}.html'
+
+    def new_build(self) -> None:
+        """Forget which fragments were used, so the next build stamps them again."""
+        with self._lock:
+            self._used.clear()
+
+    def touch(self, keys: Iterable[str]) -> None:
+        """Mark stored fragments as used by this build without reading them."""
+        if self.store is not None:
+            for key in keys:
+                self._touch(key)
+
+    def _touch(self, key: str) -> None:
+        with self._lock:
+            if key in self._used:
+                return
+            self._used.add(key)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def get(self, key: str):
+        """Look up a fragment in memory, then in the store."""
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if html is not None:
+            if self.store is not None:
+                self._touch(key)
+            return html
+        if self.store is not None:
+            try:
+                html = self._path(key).read_bytes().decode('utf-8')
+            except OSError:
+                pass
+            else:
+                self._remember(key, html)
+                self._touch(key)
+                with self._lock:
+                    self.hits += 1
+                return html
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def __setitem__(self, key: str, html: str) -> None:
+        self._remember(key, html)
+        if self.store is not None:
+            path = self._path(key)
+            with self._lock:
+                self._used.add(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                write_atomic(path, html.encode('utf-8'))
+            except OSError:
+                pass
+
+    def _remember(self, key: str, html: str) -> None:
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def shared_fragment_cache(store: Path | None = None) -> FragmentCache:
+    """The process-wide fragment cache for a store directory (or memory only).
+
+    Every build in the process uses it, so a batch worker renders a card
+    shared by several tenants (the same employer, the same project) once.
+    """
+    cache = _fragment_caches.get(store)
+    if cache is None:
+        cache = _fragment_caches[store] = FragmentCache(store=store)
+    return cache
+
+
+class FragmentRecorder:
+    """View of a FragmentCache that records the keys one page looks up.
+
+    build_site keeps each page's keys in the build manifest, so the
+    stored fragments of a page that is up to date, and so not rendered,
+    can still be marked as used (see FragmentCache.touch).
+    """
+
+    def __init__(self, cache: FragmentCache) -> None:
+        self.cache = cache
+        self.keys: set[str] = set()
+
+    def get(self, key: str):
+        self.keys.add(key)
+        return self.cache.get(key)
+
+    def __setitem__(self, key: str, html: str) -> None:
+        self.keys.add(key)
+        self.cache[key] = html
+
+
+def prune_fragment_store(store: Path, since: float) -> int:
+    """Delete stored fragments that no build has used since a given time.
+
+    FragmentCache bumps the mtime of every stored fragment a build uses,
+    so fragments older than the build's start time belong to templates
+    or content that are gone. FRAGMENT_STORE_SLACK seconds are allowed
+    for coarse file timestamps. Directories left empty are removed.
+
+    Args:
+        store: Fragment store directory.
+        since: time.time() at the start of the build (or batch).
+
+    Returns:
+        Number of fragments removed.
+    """
+    if not store.is_dir():
+        return 0
+    cutoff = since - FRAGMENT_STORE_SLACK
+    removed = 0
+    for path in store.glob('*/*.html'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            pass
+    for directory in store.iterdir():
+        if directory.is_dir() and not any(directory.iterdir()):
+            directory.rmdir()
+    return removed
+
+
 def generate_css() -> str:
     """Generate CSS for the portfolio site.
 
@@ -279,7 +1128,7 @@ body {
     padding: 0 2rem;
 }
 
-nav {
+#nav {
     position: fixed;
     top: 0;
     left: 0;
@@ -321,6 +1170,60 @@ nav {
     color: var(--navy);
 }
 
+.nav-search {
+    position: relative;
+}
+
+.search-input {
+    width: 12rem;
+    padding: 0.4rem 0.75rem;
+    border: 1px solid var(--border);
+    border-radius: 4px;
+    font: inherit;
+    font-size: 0.875rem;
+    color: var(--text-dark);
+}
+
+.search-input:focus {
+    outline: 2px solid var(--gold);
+    border-color: transparent;
+}
+
+.search-results {
+    position: absolute;
+    right: 0;
+    top: calc(100% + 0.5rem);
+    width: 22rem;
+    max-width: 90vw;
+    list-style: none;
+    background: var(--white);
+    border-radius: 8px;
+    box-shadow: 0 4px 20px var(--shadow);
+    overflow: hidden;
+}
+
+.search-results a,
+.search-results .search-empty {
+    display: block;
+    padding: 0.6rem 1rem;
+    color: var(--text-dark);
+    text-decoration: none;
+}
+
+.search-results a:hover,
+.search-results a:focus {
+    background: var(--off-white);
+    color: var(--navy);
+}
+
+.search-kind {
+    display: block;
+    font-size: 0.75rem;
+    color: var(--text-light);
+    text-transform: uppercase;
+    letter-spacing: 0.05em;
+}
+
 .hero {
     min-height: 100vh;
     display: flex;
@@ -673,6 +1576,33 @@ nav {
     color: var(--gold);
 }
 
+.archive-link {
+    margin-top: 2rem;
+    text-align: center;
+}
+
+.archive-link a,
+.pagination a {
+    color: var(--navy);
+    font-weight: 600;
+    text-decoration: none;
+    transition: color 0.3s;
+}
+
+.archive-link a:hover,
+.pagination a:hover {
+    color: var(--gold);
+}
+
+.pagination {
+    display: flex;
+    justify-content: center;
+    align-items: center;
+    gap: 2rem;
+    margin-top: 3rem;
+    color: var(--text-medium);
+}
+
 .contact-content {
     max-width: 700px;
     margin: 0 auto;
@@ -772,6 +1702,10 @@ footer p {
         font-size: 0.875rem;
     }
 
+    .search-input {
+        width: 8rem;
+    }
+
     .hero h1 {
         font-size: 2rem;
     }
@@ -826,89 +1760,2320 @@ footer p {
 }'''
 
 
+def minify_css(css: str) -> str:
+    """Minify a stylesheet by removing comments and insignificant whitespace.
+
+    Args:
+        css: Stylesheet text.
+
+    Returns:
+        Equivalent, minified stylesheet.
+    """
+    css = _CSS_COMMENT.sub('', css)
+    css = _CSS_WHITESPACE.sub(' ', css)
+    css = _CSS_PUNCTUATION.sub(r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def _css_blocks(css: str) -> list:
+    """Split a stylesheet into its top-level (prelude, body) blocks."""
+    blocks = []
+    depth = 0
+    start = 0
+    body_start = 0
+    for i, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:i].strip()
+                body_start = i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[body_start:i]))
+                start = i + 1
+    return blocks
+
+
+def _is_critical_rule(prelude: str) -> bool:
+    """Check whether any selector in a rule styles above-the-fold content."""
+    return any(selector.strip().startswith(CRITICAL_SELECTOR_PREFIXES)
+               for selector in prelude.split(','))
+
+
+def extract_critical_css(css: str) -> str:
+    """Extract the rules needed to render the first screen of the page.
+
+    Keeps rules whose selectors target the nav, the hero, buttons and the
+    global resets and custom properties (CRITICAL_SELECTOR_PREFIXES), the
+    parts of media queries that touch them, and any keyframes they use.
+
+    Args:
+        css: Full stylesheet text.
+
+    Returns:
+        Minified critical stylesheet.
+    """
+    kept = []
+    keyframes = []
+    for prelude, body in _css_blocks(css):
+        if prelude.startswith('@media'):
+            rules = [f'{p}{{{b}}}' for p, b in _css_blocks(body) if _is_critical_rule(p)]
+            if rules:
+                kept.append(f"{prelude}{{{''.join(rules)}}}")
+        elif prelude.startswith('@keyframes'):
+            keyframes.append((len(kept), prelude.split()[1], f'{prelude}{{{body}}}'))
+        elif _is_critical_rule(prelude):
+            kept.append(f'{prelude}{{{body}}}')
+    used = ''.join(kept)
+    for position, name, block in reversed(keyframes):
+        if re.search(rf'\b{re.escape(name)}\b', used):
+            kept.insert(position, block)
+    return minify_css(''.join(kept))
+
+
 def generate_js() -> str:
     """Generate JavaScript for the portfolio site.
 
+    The script is loaded with ``defer``, so it runs once the document is
+    parsed. The back-to-top button is driven by an IntersectionObserver
+    watching a sentinel over the first 300px of the page, with a
+    requestAnimationFrame-throttled passive scroll listener as the
+    fallback, so nothing runs on the main thread for each scroll event.
+    Smooth in-page scrolling is left to CSS where the browser supports
+    it, and a click handler is only registered where it doesn't. The
+    search script (see generate_search_js) is only fetched once the
+    search box gets focus.
+
     Returns:
         Complete JavaScript code as a string.
     """
-    return '''document.addEventListener('DOMContentLoaded', function() {
-    const backToTopButton = document.getElementById('back-to-top');
-    const nav = document.getElementById('nav');
-
-    window.addEventListener('scroll', function() {
-        if (window.pageYOffset > 300) {
-            backToTopButton.classList.add('visible');
+    return '''(function() {
+    var backToTopButton = document.getElementById('back-to-top');
+    if (backToTopButton) {
+        if ('IntersectionObserver' in window) {
+            var sentinel = document.createElement('div');
+            sentinel.setAttribute('aria-hidden', 'true');
+            sentinel.style.cssText = 'position:absolute;top:0;left:0;width:1px;height:300px;pointer-events:none;';
+            document.body.insertBefore(sentinel, document.body.firstChild);
+            new IntersectionObserver(function(entries) {
+                backToTopButton.classList.toggle('visible', !entries[0].isIntersecting);
+            }).observe(sentinel);
         } else {
-            backToTopButton.classList.remove('visible');
+            var ticking = false;
+            window.addEventListener('scroll', function() {
+                if (ticking) {
+                    return;
+                }
+                ticking = true;
+                window.requestAnimationFrame(function() {
+                    backToTopButton.classList.toggle('visible', window.pageYOffset > 300);
+                    ticking = false;
+                });
+            }, { passive: true });
         }
-    });
-
-    backToTopButton.addEventListener('click', function() {
-        window.scrollTo({
-            top: 0,
-            behavior: 'smooth'
+        backToTopButton.addEventListener('click', function() {
+            window.scrollTo({ top: 0, behavior: 'smooth' });
         });
-    });
+    }
+
+    var search = document.getElementById('search');
+    if (search) {
+        var loadSearch = function() {
+            search.removeEventListener('focus', loadSearch);
+            var script = document.createElement('script');
+            script.src = search.getAttribute('data-script');
+            document.head.appendChild(script);
+        };
+        search.addEventListener('focus', loadSearch);
+    }
 
-    const navLinks = document.querySelectorAll('.nav-links a, .hero-links a[href^="#"]');
-    navLinks.forEach(link => {
-        link.addEventListener('click', function(e) {
-            const href = this.getAttribute('href');
-            if (href.startsWith('#')) {
+    if (!('scrollBehavior' in document.documentElement.style)) {
+        document.addEventListener('click', function(e) {
+            var link = e.target.closest('.nav-links a[href^="#"], .hero-links a[href^="#"]');
+            var target = link && document.querySelector(link.getAttribute('href'));
+            if (target) {
                 e.preventDefault();
-                const target = document.querySelector(href);
-                if (target) {
-                    target.scrollIntoView({
-                        behavior: 'smooth'
-                    });
-                }
+                target.scrollIntoView();
             }
         });
+    }
+})();'''
+
+
+def minify_js(js: str) -> str:
+    """Minify the generated script by dropping indentation and comments.
+
+    This is deliberately conservative rather than a general JavaScript
+    minifier: lines are only joined after ``{``, ``(``, ``,`` or ``;``,
+    where no automatic semicolon insertion can take place.
+
+    Args:
+        js: Script text.
+
+    Returns:
+        Minified script.
+    """
+    lines = [line.strip() for line in js.splitlines()]
+    lines = [line for line in lines if line and not line.startswith('//')]
+    out = []
+    for line in lines:
+        out.append(line)
+        out.append('' if line.endswith(('{', '(', ',', ';')) else '\n')
+    return ''.join(out).strip()
+
+
+def search_tokens(text: str) -> list:
+    """Split text into lowercase search terms, dropping stopwords and single characters."""
+    return [token for token in _SEARCH_TOKEN.findall(text.lower())
+            if len(token) > 1 and token not in SEARCH_STOPWORDS]
+
+
+def search_documents(data: Content, page_size: int = ARCHIVE_PAGE_SIZE) -> list:
+    """List the searchable entries with where each one is shown.
+
+    Every skill category, job and project is one document. Its link
+    points at the index section showing it, or at the archive page it
+    landed on.
+
+    Returns:
+        List of (title, kind, href, text) tuples.
+    """
+    pages = {id(entry): page['name'] for page in archive_pages(data, page_size)
+             for entry in page['entries']}
+    documents = [(skill.category, 'Skills', '#skills', ' '.join(skill.items))
+                 for skill in data.skills]
+    for index, job in enumerate(data.experience):
+        href = '#experience' if index < RECENT_EXPERIENCE else pages[id(job)]
+        documents.append((f'{job.title}, {job.company}', 'Experience', href,
+                          ' '.join(job.highlights)))
+    on_index = {id(project) for project in index_projects(data, page_size)}
+    for project in data.projects:
+        href = '#projects' if id(project) in on_index else pages[id(project)]
+        documents.append((project.title, 'Project', href,
+                          ' '.join([project.description, *project.tags])))
+    return documents
+
+
+def build_search_index(documents: list) -> str:
+    """Build a compact inverted index over search documents.
+
+    Terms are sorted and front-coded as [shared prefix length, suffix]
+    pairs, so the client can rebuild the sorted list and find every term
+    starting with a query prefix by binary search. Each term's postings
+    are the ids of the documents containing it, delta-encoded. Only each
+    document's title, kind and link are shipped, never its text.
+
+    Args:
+        documents: List of (title, kind, href, text) tuples from
+            search_documents.
+
+    Returns:
+        Index as compact JSON text.
+    """
+    postings: dict[str, list[int]] = {}
+    for doc_id, (title, _, _, text) in enumerate(documents):
+        for term in set(search_tokens(f'{title} {text}')):
+            postings.setdefault(term, []).append(doc_id)
+    terms = []
+    deltas = []
+    previous = ''
+    for term in sorted(postings):
+        shared = len(os.path.commonprefix([previous, term]))
+        terms.append([shared, term[shared:]])
+        ids = postings[term]
+        deltas.append([ids[0], *(b - a for a, b in zip(ids, ids[1:]))])
+        previous = term
+    index = {
+        'version': SEARCH_INDEX_VERSION,
+        'docs': [[title, kind, href] for title, kind, href, _ in documents],
+        'terms': terms,
+        'postings': deltas,
+    }
+    return json.dumps(index, separators=(',', ':'), ensure_ascii=False)
+
+
+def generate_search_js() -> str:
+    """Generate the search script, loaded on demand by the main script.
+
+    It fetches the index named by the search box's data-index attribute,
+    decodes it once, and then answers each keystroke locally: every query
+    word matches all terms it is a prefix of, and results are the
+    documents matching every word.
+
+    Returns:
+        Complete JavaScript code as a string.
+    """
+    return '''(function() {
+    var input = document.getElementById('search');
+    var list = document.getElementById('search-results');
+    var terms = [];
+    var postings = [];
+    var docs = null;
+
+    function decode(index) {
+        var previous = '';
+        index.terms.forEach(function(entry) {
+            previous = previous.slice(0, entry[0]) + entry[1];
+            terms.push(previous);
+        });
+        postings = index.postings.map(function(deltas) {
+            var id = 0;
+            return deltas.map(function(delta) {
+                id += delta;
+                return id;
+            });
+        });
+        docs = index.docs;
+    }
+
+    function matching(prefix) {
+        var low = 0;
+        var high = terms.length;
+        while (low < high) {
+            var middle = (low + high) >> 1;
+            if (terms[middle] < prefix) {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+        var ids = {};
+        for (var i = low; i < terms.length && terms[i].lastIndexOf(prefix, 0) === 0; i++) {
+            postings[i].forEach(function(id) {
+                ids[id] = true;
+            });
+        }
+        return ids;
+    }
+
+    function run() {
+        var words = input.value.toLowerCase().match(/[a-z0-9]+/g);
+        list.textContent = '';
+        if (!docs || !words) {
+            list.hidden = true;
+            return;
+        }
+        var found = null;
+        words.forEach(function(word) {
+            var ids = matching(word);
+            if (found === null) {
+                found = ids;
+            } else {
+                Object.keys(found).forEach(function(id) {
+                    if (!ids[id]) {
+                        delete found[id];
+                    }
+                });
+            }
+        });
+        var ids = Object.keys(found).slice(0, 8);
+        ids.forEach(function(id) {
+            var doc = docs[id];
+            var item = document.createElement('li');
+            var link = document.createElement('a');
+            var kind = document.createElement('span');
+            link.href = doc[2];
+            kind.className = 'search-kind';
+            kind.textContent = doc[1];
+            link.appendChild(kind);
+            link.appendChild(document.createTextNode(doc[0]));
+            item.appendChild(link);
+            list.appendChild(item);
+        });
+        if (!ids.length) {
+            var empty = document.createElement('li');
+            empty.className = 'search-empty';
+            empty.textContent = 'No matches';
+            list.appendChild(empty);
+        }
+        list.hidden = false;
+    }
+
+    input.addEventListener('input', run);
+    input.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') {
+            input.value = '';
+            run();
+        }
+    });
+    list.addEventListener('click', function() {
+        list.hidden = true;
+    });
+    fetch(input.getAttribute('data-index')).then(function(response) {
+        return response.json();
+    }).then(function(index) {
+        decode(index);
+        run();
     });
-});'''
+})();'''
 
 
-def main() -> None:
-    """Main function to generate the portfolio site."""
-    print('Loading content from data/content.yaml...')
-    data = load_content()
-    print('Creating docs directory...')
-    docs_dir = Path('docs')
-    docs_dir.mkdir(exist_ok=True)
-    docs_images_dir = docs_dir / 'images'
-    docs_images_dir.mkdir(exist_ok=True)
-    print('Generating HTML...')
-    html = generate_html(data)
-    with open(docs_dir / 'index.html', 'w', encoding='utf-8') as f:
-        f.write(html)
-    print('Generating CSS...')
-    css = generate_css()
-    with open(docs_dir / 'style.css', 'w', encoding='utf-8') as f:
-        f.write(css)
-    print('Generating JavaScript...')
-    js = generate_js()
-    with open(docs_dir / 'script.js', 'w', encoding='utf-8') as f:
-        f.write(js)
-    print('Copying images...')
-    data_images_dir = Path('data/images')
-    if data_images_dir.exists():
-        for image_file in data_images_dir.iterdir():
-            if image_file.is_file():
-                shutil.copy(image_file, docs_images_dir / image_file.name)
-                print(f'  Copied {image_file.name}')
+def file_digest(path: Path) -> str:
+    """Compute the SHA-256 digest of a file's contents.
+
+    Args:
+        path: File to hash.
+
+    Returns:
+        Hex digest string.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_digest(*parts: str) -> str:
+    """Compute a SHA-256 digest over one or more strings.
+
+    Args:
+        parts: Strings to hash, in order.
+
+    Returns:
+        Hex digest string.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def manifest_path(docs_dir: Path) -> Path:
+    """Locate the build manifest for an output directory.
+
+    Manifests live under the cache rather than in the output, so a
+    published tree (such as a committed docs/ folder) never carries the
+    stat keys that change on every checkout. Each output directory gets
+    its own file, keyed by its absolute path.
+    """
+    location = os.path.abspath(docs_dir)
+    return MANIFEST_DIR / f'{Path(location).name}-{text_digest(location)[:16]}.json'
+
+
+def load_manifest(path: Path) -> dict:
+    """Load the build manifest from a previous run.
+
+    The manifest maps each output path (relative to the docs directory)
+    to the digest of the inputs it was built from and the digest of the
+    bytes that were written. It also remembers the size, mtime and digest
+    of the source files the last build hashed, and the size and digest of
+    every file the last build published (see output_manifest), and the
+    fragment cache keys each page was last rendered from. A missing,
+    unreadable or outdated manifest yields an empty one, which forces a
+    full rebuild; outputs whose bytes are already right are still left
+    untouched.
+
+    Args:
+        path: Manifest file, from manifest_path.
+
+    Returns:
+        Manifest dictionary.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        manifest = {'version': MANIFEST_VERSION, 'outputs': {}}
+    manifest.setdefault('sources', {})
+    manifest.setdefault('published', {})
+    manifest.setdefault('fragments', {})
+    return manifest
+
+
+def save_manifest(path: Path, manifest: dict, fsync: str = 'none') -> bool:
+    """Persist the build manifest, leaving it untouched if unchanged.
+
+    Args:
+        path: Manifest file, from manifest_path.
+        manifest: Manifest dictionary to save.
+        fsync: One of FSYNC_MODES; see commit_file.
+
+    Returns:
+        True if the manifest file was written.
+    """
+    text = json.dumps(manifest, indent=1, sort_keys=True) + '\n'
+    if path.exists() and path.read_text(encoding='utf-8') == text:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, text.encode('utf-8'), fsync)
+    return True
+
+
+def is_up_to_date(path: Path, name: str, key: str, manifest: dict) -> bool:
+    """Check whether an output was built from the given inputs and is intact.
+
+    Args:
+        path: Output file on disk.
+        name: Output path relative to the docs directory.
+        key: Digest of the inputs the output would be built from.
+        manifest: Build manifest from the previous run.
+
+    Returns:
+        True if the output can be reused as-is.
+    """
+    entry = manifest['outputs'].get(name)
+    if entry is None or entry['inputs'] != key or not path.exists():
+        return False
+    return file_digest(path) == entry['hash']
+
+
+def _temp_path(path: Path) -> Path:
+    """Hidden sibling of path that no other process or thread will pick."""
+    return path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+
+def _fsync(path: Path, flags: int = os.O_RDONLY) -> None:
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def commit_file(temp_path: Path, path: Path, fsync: str = 'none') -> None:
+    """Move a finished temporary file over its destination in one rename.
+
+    Readers see either the old file or the new one, never a partial write.
+
+    Args:
+        temp_path: Fully written file in the destination's directory.
+        path: Destination to replace.
+        fsync: 'none' leaves flushing to the OS. 'files' flushes the data
+            before the rename, so a crash cannot publish a name whose
+            contents never reached the disk. 'full' also flushes the
+            directory afterwards, so the rename itself survives a crash
+            (on platforms that can open directories).
+    """
+    if fsync != 'none':
+        _fsync(temp_path)
+    os.replace(temp_path, path)
+    if fsync == 'full' and hasattr(os, 'O_DIRECTORY'):
+        _fsync(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+
+
+def write_atomic(path: Path, data: bytes, fsync: str = 'none') -> None:
+    """Write bytes under a temporary name and commit them to path."""
+    temp_path = _temp_path(path)
+    try:
+        temp_path.write_bytes(data)
+        commit_file(temp_path, path, fsync)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_stream(path: Path, fragments: Iterable[str],
+                 buffer_size: int = WRITE_BUFFER_SIZE) -> str:
+    """Write text fragments to a file through a fixed-size write buffer.
+
+    Fragments are encoded and batched into chunks of roughly buffer_size
+    bytes, so memory stays flat however large the document is.
+
+    Args:
+        path: File to write.
+        fragments: Text pieces to write, in order.
+        buffer_size: Number of bytes to collect before each write.
+
+    Returns:
+        SHA-256 hex digest of the bytes written.
+    """
+    digest = hashlib.sha256()
+    pending = []
+    pending_size = 0
+    with open(path, 'wb') as f:
+        for fragment in fragments:
+            chunk = fragment.encode('utf-8')
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= buffer_size:
+                block = b''.join(pending)
+                digest.update(block)
+                f.write(block)
+                pending.clear()
+                pending_size = 0
+        block = b''.join(pending)
+        digest.update(block)
+        f.write(block)
+    return digest.hexdigest()
+
+
+def write_output(docs_dir: Path, name: str, key: str, render, manifest: dict,
+                 fsync: str = 'none') -> bool:
+    """Render and write a text output unless its inputs are unchanged.
+
+    The output is streamed to a temporary file next to its destination and
+    only committed if its bytes differ from what is already there.
+
+    Args:
+        docs_dir: Output directory.
+        name: Output path relative to the docs directory.
+        key: Digest of the inputs the output is built from.
+        render: Zero-argument callable returning the output text, either as
+            a string or as an iterable of fragments.
+        manifest: Build manifest, updated in place.
+        fsync: One of FSYNC_MODES; see commit_file.
+
+    Returns:
+        True if the file was written.
+    """
+    path = docs_dir / name
+    if is_up_to_date(path, name, key, manifest):
+        return False
+    fragments = render()
+    if isinstance(fragments, str):
+        fragments = (fragments,)
+    temp_path = _temp_path(path)
+    try:
+        digest = write_stream(temp_path, fragments)
+        manifest['outputs'][name] = {'inputs': key, 'hash': digest}
+        if path.exists() and file_digest(path) == digest:
+            temp_path.unlink()
+            return False
+        commit_file(temp_path, path, fsync)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return True
+
+
+def rendered(text: str) -> Callable[[], str]:
+    """Wrap already rendered text as a render callable for write_output."""
+    return functools.partial(str, text)
+
+
+def write_outputs(docs_dir: Path, outputs: list, manifest: dict, fsync: str = 'none',
+                  jobs: int | None = None, profiler: BuildProfiler | None = None) -> dict:
+    """Write independent text outputs concurrently with write_output.
+
+    Args:
+        docs_dir: Output directory.
+        outputs: List of (name, key, render) tuples as taken by write_output.
+            Each render callable must not depend on loop variables that
+            change after it is created.
+        manifest: Build manifest, updated in place.
+        fsync: One of FSYNC_MODES; see commit_file.
+        jobs: Number of writer threads.
+        profiler: Optional BuildProfiler timing each output.
+
+    Returns:
+        Map of output name to whether it was written.
+    """
+    stage = (profiler or NULL_PROFILER).stage
+
+    def write(name: str, key: str, render) -> bool:
+        with stage(f'write {name}', 'write'):
+            return write_output(docs_dir, name, key, render, manifest, fsync)
+
+    with ThreadPoolExecutor(max_workers=jobs or WRITE_THREADS) as pool:
+        futures = {name: pool.submit(write, name, key, render) for name, key, render in outputs}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def source_digest(path: Path, manifest: dict, seen: set | None = None) -> str:
+    """Hash a source file, reusing the manifest's digest if it is unchanged.
+
+    Args:
+        path: Source file.
+        manifest: Build manifest, updated in place.
+        seen: Optional set the source's manifest key is added to, so a
+            build can drop the entries of sources it no longer uses.
+
+    Returns:
+        SHA-256 hex digest of the file.
+    """
+    stat = os.stat(path)
+    key = [stat.st_size, stat.st_mtime_ns]
+    entry = manifest['sources'].get(str(path))
+    if entry is None or entry['stat'] != key:
+        entry = manifest['sources'][str(path)] = {'stat': key, 'hash': file_digest(path)}
+    if seen is not None:
+        seen.add(str(path))
+    return entry['hash']
+
+
+def _asset_references(path: Path) -> list:
+    """List the files a web manifest or browserconfig file points at.
+
+    Paths are resolved relative to the referencing file's directory; a
+    leading slash is treated the same way, since the site is not served
+    from the domain root.
+    """
+    try:
+        text = path.read_text(encoding='utf-8')
+    except OSError:
+        return []
+    if path.suffix == '.json':
+        try:
+            sources = [icon['src'] for icon in json.loads(text).get('icons', [])]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return []
     else:
-        print('  Warning: data/images directory not found')
-    if 'resume' in data['profile']:
-        resume_path = Path('data') / data['profile']['resume']
-        if resume_path.exists():
-            shutil.copy(resume_path, docs_dir / resume_path.name)
-            print(f'Copied resume: {resume_path.name}')
+        sources = re.findall(r'\bsrc="([^"]+)"', text)
+    return [target for target in map(_reference_target, sources) if target]
+
+
+def _reference_target(src: str) -> str | None:
+    """Resolve a reference to a path relative to the referencing file, or None if external."""
+    if '://' in src:
+        return None
+    return posixpath.normpath(src.lstrip('/'))
+
+
+def rewrite_references(path: Path, directory: str, urls: dict) -> str:
+    """Return a web manifest or browserconfig file with its references renamed.
+
+    Args:
+        path: Source file.
+        directory: Output directory the file is published in, relative to
+            the docs directory.
+        urls: Map of output path to the path it is published under.
+
+    Returns:
+        The file's text with every local reference pointing at the
+        published name, relative to the file.
+    """
+    def rename(src: str) -> str:
+        target = _reference_target(src)
+        if target is None:
+            return src
+        name = posixpath.join(directory, target)
+        return posixpath.relpath(urls.get(name, name), directory)
+
+    text = path.read_text(encoding='utf-8')
+    if path.suffix == '.json':
+        document = json.loads(text)
+        for icon in document.get('icons', []):
+            icon['src'] = rename(icon['src'])
+        return json.dumps(document, indent=1) + '\n'
+    return re.sub(r'\bsrc="([^"]+)"', lambda m: f'src="{rename(m.group(1))}"', text)
+
+
+def fingerprint_name(name: str, digest: str) -> str:
+    """Insert a content digest before a path's suffix: style.css -> style.<digest>.css."""
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}.{digest[:FINGERPRINT_LENGTH]}{path.suffix}'))
+
+
+def cache_headers(names: Iterable[str], immutable: set) -> str:
+    """Render a _headers file giving each output its Cache-Control policy.
+
+    Fingerprinted outputs (and their precompressed siblings) never change
+    under the same name, so browsers may keep them for a year without
+    revalidating. Everything else, including the page, gets a short TTL.
+
+    Args:
+        names: Output paths relative to the docs directory.
+        immutable: The fingerprinted output paths.
+
+    Returns:
+        File contents in the Netlify/Cloudflare Pages _headers format.
+    """
+    lines = [f'/\n  Cache-Control: {SHORT_CACHE_CONTROL}']
+    for name in sorted(names):
+        base = name.removesuffix('.gz').removesuffix('.br')
+        policy = IMMUTABLE_CACHE_CONTROL if base in immutable else SHORT_CACHE_CONTROL
+        lines.append(f'/{name}\n  Cache-Control: {policy}')
+    return '\n'.join(lines) + '\n'
+
+
+def nginx_cache_snippet() -> str:
+    """Render an nginx snippet applying the same policy as cache_headers."""
+    pattern = rf'\.[0-9a-f]{{{FINGERPRINT_LENGTH}}}\.\w+(\.gz|\.br)?$'
+    return (
+        '# Cache policy for the generated site; include in its server block.\n'
+        f'location ~ "{pattern}" {{\n'
+        f'    add_header Cache-Control "{IMMUTABLE_CACHE_CONTROL}";\n'
+        '}\n'
+        'location / {\n'
+        f'    add_header Cache-Control "{SHORT_CACHE_CONTROL}";\n'
+        '}\n'
+    )
+
+
+def referenced_assets(data: Content, images_dir: Path, sizes: dict, derivatives: dict,
+                      static_icons: bool = True) -> tuple:
+    """Collect the files in data/images that the published site refers to.
+
+    Starts from what the page links to (the hero and project images,
+    unless they are served as derived variants, the icons, the Open Graph
+    image, the web manifest and browserconfig.xml) and follows the icon
+    references inside the web manifest and browserconfig.xml.
+
+    Args:
+        data: Portfolio content from load_content.
+        images_dir: Source images directory.
+        sizes: Intrinsic sizes from probe_images.
+        derivatives: Variants from derive_images.
+        static_icons: Whether the icons, web manifest and browserconfig.xml
+            are the hand-made files in data/images. False when they are
+            generated from a master icon.
+
+    Returns:
+        Tuple of (set of referenced file names that exist, sorted list of
+        referenced names that are missing).
+    """
+    pending = [OG_IMAGE]
+    if static_icons:
+        pending += [icon['href'] for icon in ICON_LINKS]
+        pending += [TILE_IMAGE, WEB_MANIFEST, BROWSERCONFIG]
+    for name, role in image_roles(data).items():
+        view = picture(name, role, sizes, derivatives)
+        if not view['src'].startswith('images/derived/'):
+            pending.append(name)
+    found = set()
+    missing = set()
+    while pending:
+        name = pending.pop()
+        if name in found or name in missing:
+            continue
+        if not (images_dir / name).is_file():
+            missing.add(name)
+            continue
+        found.add(name)
+        if name in (WEB_MANIFEST, BROWSERCONFIG):
+            pending += _asset_references(images_dir / name)
+    return found, sorted(missing)
+
+
+def prune_outputs(docs_dir: Path, produced: set, manifest: dict) -> list:
+    """Delete outputs that the current build did not produce.
+
+    Removes files recorded in the manifest by earlier builds, and any file
+    under the output images directory, that are not in produced, along
+    with directories they leave empty. Other files in the output
+    directory (such as CNAME) are left alone.
+
+    Args:
+        docs_dir: Output directory.
+        produced: Output paths, relative to docs_dir, written or confirmed
+            by this build.
+        manifest: Build manifest, updated in place.
+
+    Returns:
+        Sorted list of removed output paths.
+    """
+    stale = {name for name in manifest['outputs'] if name not in produced}
+    images_dir = docs_dir / 'images'
+    if images_dir.exists():
+        stale.update(path.relative_to(docs_dir).as_posix() for path in images_dir.rglob('*')
+                     if path.is_file() and path.relative_to(docs_dir).as_posix() not in produced)
+    for name in stale:
+        (docs_dir / name).unlink(missing_ok=True)
+        manifest['outputs'].pop(name, None)
+    emptied = {(docs_dir / name).parent for name in stale}
+    emptied.update(p for p in images_dir.rglob('*') if p.is_dir())
+    for directory in sorted(emptied, key=lambda p: len(p.parts), reverse=True):
+        if directory != docs_dir and directory.is_dir() and not any(directory.iterdir()):
+            directory.rmdir()
+    return sorted(stale)
+
+
+def output_manifest(docs_dir: Path, produced: Iterable[str], manifest: dict) -> dict:
+    """Describe every published file by size and digest.
+
+    Digests come from the build manifest, so nothing is re-read except
+    files it has no digest for.
+
+    Args:
+        docs_dir: Output directory.
+        produced: Output paths, relative to docs_dir, that make up the site.
+        manifest: Build manifest.
+
+    Returns:
+        Map of output path to {'size', 'hash'}.
+    """
+    published = {}
+    for name in sorted(produced):
+        entry = manifest['outputs'].get(name)
+        published[name] = {'size': (docs_dir / name).stat().st_size,
+                           'hash': entry['hash'] if entry else file_digest(docs_dir / name)}
+    return published
+
+
+def deploy_delta(previous: dict, current: dict) -> dict:
+    """Compare two output manifests.
+
+    Returns:
+        Dictionary with sorted 'added', 'changed' and 'removed' path lists.
+    """
+    return {
+        'added': sorted(current.keys() - previous.keys()),
+        'changed': sorted(name for name in current.keys() & previous.keys()
+                          if current[name]['hash'] != previous[name]['hash']),
+        'removed': sorted(previous.keys() - current.keys()),
+    }
+
+
+def write_delta(docs_dir: Path, delta_dir: Path, delta: dict, published: dict,
+                fsync: str = 'none') -> None:
+    """Write a deploy delta: a change list and a tarball of the new bytes.
+
+    delta.json holds the added, changed and removed paths, the number of
+    bytes to upload, and the complete output manifest ('files'), which a
+    deploy step can keep and pass back as the base of the next delta.
+    delta.tar.gz holds only the added and changed files, with fixed
+    ownership and timestamps so an unchanged delta has identical bytes.
+
+    Args:
+        docs_dir: Output directory the files are taken from.
+        delta_dir: Directory to write delta.json and delta.tar.gz to.
+        delta: Changes from deploy_delta.
+        published: Output manifest of this build.
+        fsync: One of FSYNC_MODES; see commit_file.
+    """
+    delta_dir.mkdir(parents=True, exist_ok=True)
+    upload = delta['added'] + delta['changed']
+    archive_path = delta_dir / DELTA_ARCHIVE
+    temp_path = _temp_path(archive_path)
+    try:
+        with open(temp_path, 'wb') as raw, \
+                gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0) as compressed, \
+                tarfile.open(fileobj=compressed, mode='w', format=tarfile.PAX_FORMAT) as tar:
+            for name in sorted(upload):
+                info = tarfile.TarInfo(name)
+                info.size = published[name]['size']
+                info.mode = 0o644
+                with open(docs_dir / name, 'rb') as f:
+                    tar.addfile(info, f)
+        commit_file(temp_path, archive_path, fsync)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    listing = {**delta, 'bytes': sum(published[name]['size'] for name in upload),
+               'files': published}
+    write_atomic(delta_dir / DELTA_LIST, (json.dumps(listing, indent=1) + '\n').encode('utf-8'),
+                 fsync)
+
+
+def _reflink(src, dst) -> bool:
+    """Clone a file's extents copy-on-write, where the filesystem allows it."""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        return False
+
+
+def _kernel_copy(src, dst, size: int) -> None:
+    """Copy file contents inside the kernel, falling back to a buffered copy."""
+    for kernel_copy in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+        if kernel_copy is None:
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                if kernel_copy is os.sendfile:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                else:
+                    sent = os.copy_file_range(src.fileno(), dst.fileno(), size - offset,
+                                              offset, offset)
+                if sent == 0:
+                    break
+                offset += sent
+            if offset == size:
+                return
+        except OSError:
+            pass
+        dst.seek(0)
+        dst.truncate()
+    src.seek(0)
+    shutil.copyfileobj(src, dst, WRITE_BUFFER_SIZE)
+
+
+def _copy_file(source: Path, path: Path, hardlink: bool, fsync: str = 'none') -> None:
+    """Publish a copy of source at path without its bytes passing through Python.
+
+    Tries a hardlink (if allowed), then a reflink, then copy_file_range or
+    sendfile, and only then a buffered copy. The copy is made under a
+    temporary name and committed with commit_file.
+    """
+    temp_path = _temp_path(path)
+    try:
+        if hardlink:
+            try:
+                os.link(source, temp_path)
+                commit_file(temp_path, path, fsync)
+                return
+            except OSError:
+                temp_path.unlink(missing_ok=True)
+        with open(source, 'rb') as src, open(temp_path, 'wb') as dst:
+            if not _reflink(src, dst):
+                _kernel_copy(src, dst, os.fstat(src.fileno()).st_size)
+        commit_file(temp_path, path, fsync)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _sync_asset(source: Path, path: Path, entry: dict | None, hardlink: bool,
+                fsync: str = 'none') -> tuple:
+    """Bring one copied asset up to date.
+
+    Returns:
+        Tuple of (copied, manifest entry).
+    """
+    source_stat = os.stat(source)
+    source_key = [source_stat.st_size, source_stat.st_mtime_ns]
+    try:
+        stat = os.stat(path)
+        path_key = [stat.st_size, stat.st_mtime_ns]
+    except FileNotFoundError:
+        path_key = None
+    if entry and entry.get('source') == source_key and entry.get('stat') == path_key:
+        return False, entry
+    digest = file_digest(source)
+    copied = not (path_key and path_key[0] == source_key[0] and file_digest(path) == digest)
+    if copied:
+        _copy_file(source, path, hardlink, fsync)
+        stat = os.stat(path)
+        path_key = [stat.st_size, stat.st_mtime_ns]
+    return copied, {'inputs': digest, 'hash': digest, 'source': source_key, 'stat': path_key}
+
+
+def copy_assets(docs_dir: Path, assets: list, manifest: dict, hardlink: bool = False,
+                jobs: int | None = None, profiler: BuildProfiler | None = None,
+                fsync: str = 'none') -> dict:
+    """Copy static files into the docs directory, skipping ones already current.
+
+    A file whose source and destination size and mtime both match the
+    manifest is skipped without being read. Otherwise the source is
+    hashed and copied unless the destination holds the same bytes, so
+    outputs that went missing or were modified are repaired. Copies run
+    concurrently on a thread pool.
+
+    Args:
+        docs_dir: Output directory.
+        assets: List of (source path, destination name relative to docs_dir).
+        manifest: Build manifest, updated in place.
+        hardlink: Hardlink outputs to their sources instead of copying.
+            Only safe if sources are never edited in place.
+        jobs: Number of copy threads.
+        profiler: Optional BuildProfiler timing each copy.
+        fsync: One of FSYNC_MODES; see commit_file.
+
+    Returns:
+        Map of destination name to (copied, SHA-256 digest).
+    """
+    outputs = manifest['outputs']
+    stage = (profiler or NULL_PROFILER).stage
+
+    def sync(source: Path, name: str) -> tuple:
+        with stage(f'copy {name}', 'copy') as record:
+            copied, entry = _sync_asset(source, docs_dir / name, outputs.get(name), hardlink, fsync)
+            if record is not None:
+                record['args'].update(size=entry['source'][0], copied=copied)
+            return copied, entry
+
+    with ThreadPoolExecutor(max_workers=jobs or COPY_THREADS) as pool:
+        futures = {name: pool.submit(sync, source, name) for source, name in assets}
+        results = {}
+        for name, future in futures.items():
+            copied, entry = future.result()
+            outputs[name] = entry
+            results[name] = (copied, entry['hash'])
+    return results
+
+
+def _jpeg_orientation(segment: bytes) -> int:
+    """Read the EXIF orientation tag from a JPEG APP1 segment, or 1."""
+    if not segment.startswith(b'Exif\0\0'):
+        return 1
+    tiff = segment[6:]
+    order: Literal['little', 'big'] = 'little' if tiff[:2] == b'II' else 'big'
+    offset = int.from_bytes(tiff[4:8], order)
+    count = int.from_bytes(tiff[offset:offset + 2], order)
+    for i in range(count):
+        entry = tiff[offset + 2 + 12 * i:offset + 14 + 12 * i]
+        if len(entry) == 12 and int.from_bytes(entry[:2], order) == 0x0112:
+            return int.from_bytes(entry[8:10], order)
+    return 1
+
+
+def _jpeg_size(f) -> tuple | None:
+    """Walk JPEG segments up to the first start-of-frame marker."""
+    orientation = 1
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        while code == 0xFF:
+            fill = f.read(1)
+            if not fill:
+                return None
+            code = fill[0]
+        if code == 0x01 or 0xD0 <= code <= 0xD8:
+            continue
+        field = f.read(2)
+        length = int.from_bytes(field, 'big')
+        if len(field) < 2 or length < 2:
+            return None
+        if code == 0xE1 and orientation == 1:
+            orientation = _jpeg_orientation(f.read(length - 2))
+        elif code in _JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height = int.from_bytes(frame[1:3], 'big')
+            width = int.from_bytes(frame[3:5], 'big')
+            return (height, width) if orientation >= 5 else (width, height)
+        else:
+            f.seek(length - 2, 1)
+
+
+def read_image_size(path: Path) -> tuple | None:
+    """Read an image's pixel dimensions from its header.
+
+    Supports PNG, JPEG (honouring the EXIF orientation), WebP and GIF
+    without decoding any pixel data; only the first few bytes are read,
+    except for JPEG, where segments are skipped up to the frame header.
+
+    Args:
+        path: Image file.
+
+    Returns:
+        (width, height) tuple, or None if the format isn't recognized.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+            return int.from_bytes(head[16:20], 'big'), int.from_bytes(head[20:24], 'big')
+        if head.startswith(b'\xff\xd8'):
+            return _jpeg_size(f)
+        if head.startswith((b'GIF87a', b'GIF89a')):
+            return int.from_bytes(head[6:8], 'little'), int.from_bytes(head[8:10], 'little')
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                return (int.from_bytes(head[26:28], 'little') & 0x3FFF,
+                        int.from_bytes(head[28:30], 'little') & 0x3FFF)
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b'VP8X':
+                return (int.from_bytes(head[24:27], 'little') + 1,
+                        int.from_bytes(head[27:30], 'little') + 1)
+    return None
+
+
+def probe_images(images_dir: Path, digests: dict | None = None) -> dict:
+    """Look up the intrinsic size of images in a directory.
+
+    Sizes are cached in .cache/image-sizes.json keyed by each file's
+    SHA-256, so a header is only parsed once per distinct image.
+
+    Args:
+        images_dir: Directory holding the images.
+        digests: Optional map of file name to SHA-256 digest. When given,
+            only these images are probed; otherwise every image in the
+            directory is hashed and probed.
+
+    Returns:
+        Map of file name to {'width': ..., 'height': ...} for every
+        recognized image.
+    """
+    if digests is None:
+        digests = {path.name: file_digest(path) for path in sorted(images_dir.glob('*'))
+                   if path.is_file()} if images_dir.exists() else {}
+    cache_path = CACHE_DIR / 'image-sizes.json'
+    try:
+        cache = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        cache = {}
+    cache_size = len(cache)
+    sizes = {}
+    for name, digest in sorted(digests.items()):
+        path = images_dir / name
+        if path.suffix.lower() in IMAGE_SUFFIXES:
+            if digest not in cache:
+                cache[digest] = read_image_size(path)
+            if cache[digest]:
+                width, height = cache[digest]
+                sizes[name] = {'width': width, 'height': height}
+    if len(cache) != cache_size:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_name(f'.{cache_path.name}.{os.getpid()}.tmp')
+            temp_path.write_text(json.dumps(cache), encoding='utf-8')
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+    return sizes
+
+
+def derivative_formats() -> list:
+    """List the modern formats the installed Pillow can encode, best first."""
+    formats = []
+    for name in ('avif', 'webp'):
+        try:
+            if features.check(name):
+                formats.append(name)
+        except ValueError:
+            pass
+    return formats
+
+
+def _derivative_widths(widths: tuple, source_width: int) -> list:
+    """Target widths for a source, never upscaling past its own width."""
+    kept = [width for width in widths if width < source_width]
+    if len(kept) < len(widths):
+        kept.append(source_width)
+    return kept
+
+
+def _encode_derivatives(source: Path, out_dir: Path, widths: tuple, formats: list) -> list:
+    """Encode resized variants of one image into a cache directory.
+
+    Runs in a worker process. Variants are written to a temporary
+    directory which is renamed into place once complete, so concurrent
+    builds never see a partial set.
+
+    Returns:
+        List of variant dictionaries with 'format', 'width', 'height'
+        and 'file' keys.
+    """
+    assert Image is not None, 'callers check for Pillow first'
+    variants = []
+    temp_dir = out_dir.with_name(f'.{out_dir.name}.{os.getpid()}.tmp')
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        if alpha:
+            image = image.convert('RGBA')
+            alpha = image.getchannel('A').getextrema() != (255, 255)
+        image = image.convert('RGBA' if alpha else 'RGB')
+        for width in _derivative_widths(widths, image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in [*formats, 'png' if alpha else 'jpeg']:
+                name = f"{source.stem}-{width}.{'jpg' if fmt == 'jpeg' else fmt}"
+                options: dict = {'optimize': True} if fmt in ('png', 'jpeg') else {}
+                if fmt in DERIVATIVE_QUALITY:
+                    options['quality'] = DERIVATIVE_QUALITY[fmt]
+                if fmt == 'jpeg':
+                    options['progressive'] = True
+                resized.save(temp_dir / name, fmt.upper(), **options)
+                variants.append({'format': fmt, 'width': width, 'height': height, 'file': name})
+    (temp_dir / 'variants.json').write_text(json.dumps(variants), encoding='utf-8')
+    try:
+        os.replace(temp_dir, out_dir)
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return variants
+
+
+def derive_images(requests: list, jobs: int | None = None,
+                  profiler: BuildProfiler | None = None) -> dict:
+    """Produce responsive variants for images, encoding each only once.
+
+    Variants for a source are cached under .cache/derived in a directory
+    keyed by the source's hash and the encoding settings; only cache
+    misses are encoded, on a process pool. Its workers are spawned
+    rather than forked, because build stages call this from a thread
+    while other threads may hold locks a forked child would inherit.
+
+    Args:
+        requests: List of (name, path, digest, role) tuples, where role is
+            a key of IMAGE_DERIVATIVES.
+        jobs: Number of encoder processes (defaults to the CPU count).
+        profiler: Optional BuildProfiler; each encoding task is profiled
+            in its worker and recorded here.
+
+    Returns:
+        Map of image name to (cache directory, variant list). Empty if
+        Pillow is not installed.
+    """
+    if Image is None:
+        return {}
+    formats = derivative_formats()
+    results = {}
+    misses = []
+    for name, path, digest, role in requests:
+        widths = IMAGE_DERIVATIVES[role]['widths']
+        key = text_digest(digest, Image.__version__, json.dumps([widths, formats, DERIVATIVE_QUALITY]))
+        out_dir = CACHE_DIR / 'derived' / key
+        try:
+            variants = json.loads((out_dir / 'variants.json').read_text(encoding='utf-8'))
+            results[name] = (out_dir, variants)
+        except (OSError, ValueError):
+            misses.append((name, path, out_dir, widths))
+    if misses:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=get_context('spawn')) as pool:
+            if profiler is None or not profiler.enabled:
+                futures = {name: (out_dir, pool.submit(_encode_derivatives, path, out_dir, widths, formats))
+                           for name, path, out_dir, widths in misses}
+                for name, (out_dir, future) in futures.items():
+                    results[name] = (out_dir, future.result())
+            else:
+                profiled = {name: (out_dir, pool.submit(
+                                _profiled_call, f'encode {name}', 'image',
+                                {'widths': list(widths), 'formats': formats},
+                                _encode_derivatives, path, out_dir, widths, formats))
+                            for name, path, out_dir, widths in misses}
+                for name, (out_dir, call) in profiled.items():
+                    variants, record = call.result()
+                    profiler.add(record)
+                    results[name] = (out_dir, variants)
+    return results
+
+
+def image_roles(data: Content) -> dict:
+    """Map each image shown on the site to its IMAGE_DERIVATIVES role."""
+    roles = {Path(data.profile.photo).name: 'hero'}
+    for project in data.projects:
+        if project.image:
+            roles.setdefault(project.image, 'project')
+    return roles
+
+
+def picture(name: str, role: str, sizes: dict, derivatives: dict, urls: dict | None = None) -> dict:
+    """Describe how to render an image, with responsive sources if available.
+
+    Args:
+        name: Image file name in data/images.
+        role: Key of IMAGE_DERIVATIVES describing how the image is shown.
+        sizes: Intrinsic sizes from probe_images.
+        derivatives: Variants from derive_images.
+        urls: Optional map of output path to fingerprinted path.
+
+    Returns:
+        Dictionary with 'src', 'srcset', 'sizes', 'width', 'height' for the
+        <img> tag and a list of 'sources' (each with 'type' and 'srcset')
+        for a surrounding <picture>.
+    """
+    urls = urls or {}
+
+    def url(path: str) -> str:
+        return urls.get(path, path)
+
+    size = sizes.get(name) or {'width': None, 'height': None}
+    view = {'src': url(f'images/{name}'), 'srcset': '', 'sizes': '', 'sources': [], **size}
+    if name not in derivatives:
+        return view
+    variants = derivatives[name][1]
+    by_format: dict[str, list] = {}
+    for variant in variants:
+        by_format.setdefault(variant['format'], []).append(variant)
+    fallback = by_format.pop('jpeg', None) or by_format.pop('png')
+
+    def srcset(group: list) -> str:
+        return ', '.join(f"{url('images/derived/' + v['file'])} {v['width']}w" for v in group)
+
+    view.update({
+        'src': url(f"images/derived/{fallback[len(fallback) // 2]['file']}"),
+        'srcset': srcset(fallback),
+        'sizes': IMAGE_DERIVATIVES[role]['sizes'],
+        'width': fallback[-1]['width'],
+        'height': fallback[-1]['height'],
+        'sources': [{'type': DERIVATIVE_MIME_TYPES[fmt], 'srcset': srcset(group)}
+                    for fmt, group in by_format.items()],
+    })
+    return view
+
+
+def _encode_icons(master: Path, out_dir: Path, sizes: list) -> dict:
+    """Render square PNG icons from a master image into a cache directory.
+
+    Like _encode_derivatives, icons are written to a temporary directory
+    that is renamed into place once complete.
+
+    Returns:
+        Map of size to icon file name.
+    """
+    assert Image is not None, 'callers check for Pillow first'
+    files = {size: f'icon-{size}x{size}.png' for size in sizes}
+    temp_dir = out_dir.with_name(f'.{out_dir.name}.{os.getpid()}.tmp')
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    with Image.open(master) as opened:
+        image = ImageOps.exif_transpose(opened).convert('RGBA')
+        side = min(image.size)
+        image = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+        for size, name in files.items():
+            image.resize((size, size), Image.Resampling.LANCZOS).save(temp_dir / name, 'PNG', optimize=True)
+    (temp_dir / 'icons.json').write_text(json.dumps(files), encoding='utf-8')
+    try:
+        os.replace(temp_dir, out_dir)
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return files
+
+
+def derive_icons(master: Path, digest: str) -> tuple:
+    """Produce every icon size the page, web manifest and browserconfig use.
+
+    Icons are cached under .cache/icons in a directory keyed by the
+    master image's hash and the list of sizes, so they are only rendered
+    when the master or ICON_SIZES changes.
+
+    Args:
+        master: Master icon image, ideally square and at least as large as
+            the biggest size in ICON_SIZES.
+        digest: SHA-256 digest of the master image.
+
+    Returns:
+        Tuple of (cache directory, map of size to icon file name). The
+        map is empty if Pillow is not installed.
+    """
+    sizes = sorted({size for group in ICON_SIZES.values() for size in group})
+    out_dir = CACHE_DIR / 'icons' / text_digest(digest, Image.__version__ if Image else '', json.dumps(sizes))
+    if Image is None:
+        return out_dir, {}
+    try:
+        files = json.loads((out_dir / 'icons.json').read_text(encoding='utf-8'))
+        return out_dir, {int(size): name for size, name in files.items()}
+    except (OSError, ValueError):
+        return out_dir, _encode_icons(master, out_dir, sizes)
+
+
+def icon_set(icons: dict | None) -> tuple:
+    """List the icon <link> tags and tile image for the page head.
+
+    Args:
+        icons: Map of icon size to output path from derive_icons, or None
+            to use the hand-made files in data/images.
+
+    Returns:
+        Tuple of (list of dictionaries with 'rel', 'type', 'sizes' and
+        'href' keys, tile image output path).
+    """
+    if not icons:
+        return ([{**icon, 'href': f"images/{icon['href']}"} for icon in ICON_LINKS],
+                f'images/{TILE_IMAGE}')
+    links = [{'rel': rel, 'type': 'image/png' if rel == 'icon' else '',
+              'sizes': f'{size}x{size}', 'href': icons[size]}
+             for rel in ('apple-touch-icon', 'icon') for size in ICON_SIZES[rel]]
+    return links, icons[ICON_SIZES['tile'][0]]
+
+
+def render_web_manifest(data: Content, icons: dict, urls: dict) -> str:
+    """Render images/manifest.json for icons produced by derive_icons."""
+    def url(name: str) -> str:
+        return posixpath.relpath(urls.get(name, name), 'images')
+
+    document = {
+        'name': data.profile.name,
+        'icons': [{'src': url(icons[size]), 'sizes': f'{size}x{size}', 'type': 'image/png',
+                   'density': str(size / 48)} for size in ICON_SIZES['manifest']],
+    }
+    return json.dumps(document, indent=1) + '\n'
+
+
+def render_browserconfig(icons: dict, urls: dict) -> str:
+    """Render images/browserconfig.xml for icons produced by derive_icons."""
+    def url(name: str) -> str:
+        return posixpath.relpath(urls.get(name, name), 'images')
+
+    tiles = ''.join(f'<square{size}x{size}logo src="{url(icons[size])}"/>'
+                    for size in ICON_SIZES['browserconfig'])
+    return ('<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<browserconfig><msapplication><tile>{tiles}<TileColor>{TILE_COLOR}</TileColor>'
+            '</tile></msapplication></browserconfig>\n')
+
+
+def _gzip(data: bytes) -> bytes:
+    """Gzip at the highest ratio available, with a fixed mtime for stable bytes."""
+    if zopfli_gzip is not None:
+        return zopfli_gzip.compress(data)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    """Brotli at maximum quality, tuned for text."""
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+
+
+def precompressors() -> list:
+    """List the available precompressed-sibling encoders.
+
+    Returns:
+        List of (file suffix, encoder id, compress function) tuples. The
+        encoder id is part of each sibling's manifest key, so installing
+        zopfli or brotli later rebuilds the affected files.
+    """
+    encoders = [('.gz', 'zopfli' if zopfli_gzip is not None else 'gzip-9', _gzip)]
+    if brotli is not None:
+        encoders.append(('.br', 'brotli-11', _brotli))
+    return encoders
+
+
+def _compress_file(path: Path, compress) -> tuple:
+    data = path.read_bytes()
+    return len(data), compress(data)
+
+
+def compress_outputs(docs_dir: Path, names: list, manifest: dict, jobs: int | None = None,
+                     profiler: BuildProfiler | None = None, fsync: str = 'none') -> list:
+    """Write .gz and .br siblings next to text outputs.
+
+    Siblings are only recomputed when the source's hash (or the encoder)
+    changed since the last build. Compression runs on a thread pool; zlib
+    and brotli release the GIL while compressing.
+
+    Args:
+        docs_dir: Output directory.
+        names: Output paths, relative to docs_dir, to precompress.
+        manifest: Build manifest, updated in place.
+        jobs: Number of compression threads (defaults to the CPU count).
+        profiler: Optional BuildProfiler timing each compression task.
+        fsync: One of FSYNC_MODES; see commit_file.
+
+    Returns:
+        Size report: one dictionary per source with its raw size, the size
+        of each sibling keyed by suffix, and whether anything was written.
+    """
+    report = {name: {'name': name, 'raw': (docs_dir / name).stat().st_size, 'written': 0}
+              for name in names}
+    tasks = []
+    for name in names:
+        source_hash = manifest['outputs'][name]['hash']
+        for suffix, encoder, compress in precompressors():
+            sibling = name + suffix
+            key = text_digest(source_hash, encoder)
+            if is_up_to_date(docs_dir / sibling, sibling, key, manifest):
+                report[name][suffix] = (docs_dir / sibling).stat().st_size
+            else:
+                tasks.append((name, suffix, key, compress))
+    stage = (profiler or NULL_PROFILER).stage
+
+    def run(task: tuple) -> tuple:
+        with stage(f'compress {task[0]}{task[1]}', 'compress'):
+            return _compress_file(docs_dir / task[0], task[3])
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(run, tasks)
+        for (name, suffix, key, _), (_, data) in zip(tasks, results):
+            sibling = name + suffix
+            write_atomic(docs_dir / sibling, data, fsync)
+            manifest['outputs'][sibling] = {'inputs': key, 'hash': hashlib.sha256(data).hexdigest()}
+            report[name][suffix] = len(data)
+            report[name]['written'] += 1
+    return list(report.values())
+
+
+def print_compression_report(report: list) -> None:
+    """Print raw versus precompressed sizes for each text output."""
+    suffixes = [suffix for suffix, _, _ in precompressors()]
+    print(f"  {'file':<28}{'raw':>10}" + ''.join(f'{suffix:>16}' for suffix in suffixes))
+    totals = dict.fromkeys(['raw', *suffixes], 0)
+    for row in report:
+        for column in totals:
+            totals[column] += row.get(column, 0)
+        print(f"  {row['name']:<28}{row['raw']:>10,}" + ''.join(
+            f"{row.get(suffix, 0):>9,} ({row.get(suffix, 0) / max(row['raw'], 1):>4.0%})"
+            for suffix in suffixes))
+    print(f"  {'total':<28}{totals['raw']:>10,}" + ''.join(
+        f"{totals[suffix]:>9,} ({totals[suffix] / max(totals['raw'], 1):>4.0%})"
+        for suffix in suffixes))
+    if brotli is None:
+        print('  (install brotli to also emit .br files)')
+
+
+@functools.cache
+def generator_digest() -> str:
+    """Digest of the generator's source and templates, computed once per process."""
+    parts = [file_digest(Path(__file__))]
+    for path in sorted(TEMPLATE_DIR.glob('*.html')):
+        parts += [path.name, file_digest(path)]
+    return text_digest(*parts)
+
+
+def run_stages(stages: dict, concurrency: int = BUILD_CONCURRENCY) -> dict:
+    """Run a dependency graph of build stages, overlapping independent ones.
+
+    Each stage starts as soon as the stages it depends on have finished,
+    on a thread pool of at most concurrency workers. CPU-heavy stages
+    hand their work to process or thread pools of their own, or to code
+    that releases the GIL, so file I/O keeps going meanwhile. The first
+    stage to fail cancels every stage that has not started yet, and its
+    exception is raised once the stages already running have finished.
+
+    Args:
+        stages: Map of stage name to (names of the stages it depends on,
+            function). Each function is called with the dictionary of
+            results so far, which holds every stage it depends on, and
+            returns its own result.
+        concurrency: Maximum number of stages running at once.
+
+    Returns:
+        Map of stage name to result.
+
+    Raises:
+        ValueError: If a stage depends on an unknown stage or the stages
+            depend on each other in a cycle.
+    """
+    pending = {name: set(dependencies) for name, (dependencies, _) in stages.items()}
+    for name, dependencies in pending.items():
+        unknown = dependencies - stages.keys()
+        if unknown:
+            raise ValueError(f"stage {name!r} depends on unknown stage {', '.join(sorted(unknown))}")
+    while pending:
+        ready = [name for name, dependencies in pending.items() if not dependencies & pending.keys()]
+        if not ready:
+            raise ValueError(f"stages depend on each other in a cycle: {', '.join(sorted(pending))}")
+        for name in ready:
+            del pending[name]
+    return asyncio.run(_run_stages(stages, concurrency))
+
+
+async def _run_stages(stages: dict, concurrency: int) -> dict:
+    loop = asyncio.get_running_loop()
+    results: dict = {}
+    tasks: dict[str, asyncio.Future] = {}
+
+    async def run(name: str) -> None:
+        dependencies, function = stages[name]
+        await asyncio.gather(*(tasks[dependency] for dependency in dependencies))
+        results[name] = await loop.run_in_executor(executor, function, results)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        tasks.update((name, asyncio.ensure_future(run(name))) for name in stages)
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+    return results
+
+
+def build_site(content_path: Path = CONTENT_FILE, docs_dir: Path = DOCS_DIR,
+               force: bool = False, verbose: bool = True, compress: bool = True,
+               production: bool = False, responsive_images: bool = True,
+               hardlink: bool = False, prune: bool = True, fingerprint: bool = False,
+               profiler: BuildProfiler | None = None, page_size: int = ARCHIVE_PAGE_SIZE,
+               fsync: str = 'none', delta: Path | None = None,
+               delta_base: Path | None = None, fragment_store: Path | None = None,
+               concurrency: int = BUILD_CONCURRENCY,
+               published_dir: Path | None = None, prune_fragments: bool = True) -> dict:
+    """Build one portfolio site from a content file.
+
+    Images and the resume are resolved relative to the directory holding
+    the content file, so each portfolio is a self-contained data folder.
+
+    The build is a graph of stages run by run_stages: content loading,
+    the stylesheet, scripts, image probing and encoding and icon
+    rendering run side by side, and pages are rendered and written as a
+    stream while the stylesheet, scripts and assets are compressed.
+
+    Every file is written under a temporary name and renamed into place,
+    so readers never see a partial file. Pages are published only after
+    every asset, stylesheet, script and document they reference is in
+    place.
+
+    Args:
+        content_path: Content YAML file to build from.
+        docs_dir: Output directory for the generated site.
+        force: Ignore the build manifest and rebuild everything.
+        verbose: Print progress messages.
+        compress: Write precompressed .gz/.br siblings of text outputs.
+        production: Minify the stylesheet and script, and inline the
+            critical CSS in the page head, loading the full stylesheet
+            without blocking.
+        responsive_images: Encode resized AVIF/WebP/JPEG variants of the
+            hero photo and project images and emit them with srcset.
+            Requires Pillow; skipped with a message when it's missing.
+        hardlink: Hardlink copied assets to their sources instead of
+            copying them. Only safe if sources are never edited in place.
+        prune: Delete outputs from earlier builds that this build no
+            longer produces, including anything unreferenced under images/.
+        fingerprint: Publish the stylesheet, script, images and web
+            manifest under content-hashed names, rewrite every reference
+            to them, and write _headers and _nginx.conf files that let
+            browsers cache those files forever.
+        profiler: Optional BuildProfiler recording every stage of the
+            build, down to each HTML section, copy and compression task.
+        page_size: Entries per projects/page-N.html and
+            experience/page-N.html archive page.
+        fsync: One of FSYNC_MODES; see commit_file.
+        delta: Directory to write a deploy delta to (see write_delta):
+            the files added, changed and removed since the previous build,
+            and a tarball of the added and changed ones.
+        delta_base: delta.json from an earlier delta (typically the last
+            one deployed) to compare against instead of the previous build.
+        fragment_store: Directory to persist rendered fragments in, so
+            later builds and other processes reuse unchanged sections and
+            cards. Fragments are always shared within the process (see
+            shared_fragment_cache). With prune, fragments this build did
+            not use are deleted from the store afterwards.
+        concurrency: Maximum number of build stages running at once.
+        published_dir: Directory the output is published as, when docs_dir
+            is a staging copy of it (see build_generation). The build
+            manifest (see manifest_path) is kept per published directory.
+        prune_fragments: Set to False to leave the fragment store alone
+            even with prune, as build_batch does for each tenant before
+            pruning the shared store once.
+
+    Returns:
+        Dictionary with 'written' and 'skipped' file counts, plus a
+        'compression' size report when compress is set and, when prune
+        is set, the 'dropped' source images that were neither published
+        nor replaced by responsive variants or rendered icons, and
+        the stale outputs that were 'removed'. With delta, 'delta' holds
+        the added, changed and removed counts and the bytes to upload.
+        'fragments' counts the sections and cards that were 'reused' from
+        the fragment cache and those 'rendered'.
+    """
+    echo_lock = threading.Lock()
+
+    def echo(*args) -> None:
+        if verbose:
+            with echo_lock:
+                print(*args, flush=True)
+
+    started = time.time()
+    profiler = profiler or NULL_PROFILER
+    stage = profiler.stage
+    data_dir = content_path.parent
+    data_images_dir = data_dir / 'images'
+    docs_images_dir = docs_dir / 'images'
+    generator_hash = text_digest(generator_digest(), 'production' if production else 'development')
+    fragments = shared_fragment_cache(fragment_store)
+    fragments.new_build()
+    manifest_file = manifest_path(published_dir or docs_dir)
+    seen_sources: set = set()
+
+    def load(results: dict) -> tuple:
+        echo(f'Loading content from {content_path}...')
+        with stage('load content', 'content'):
+            return load_content_cached(content_path)
+
+    def prepare_output(results: dict) -> dict:
+        echo(f'Creating {docs_dir} directory...')
+        docs_images_dir.mkdir(parents=True, exist_ok=True)
+        with stage('load manifest', 'manifest'):
+            manifest = load_manifest(manifest_file)
+        if force:
+            manifest['outputs'] = {}
+        return manifest
+
+    def styles(results: dict) -> tuple:
+        with stage('css', 'css', production=production):
+            css = generate_css()
+            if production:
+                return minify_css(css), extract_critical_css(css)
+            return css, ''
+
+    def scripts(results: dict) -> str:
+        with stage('js', 'js', production=production):
+            js = generate_js()
+            return minify_js(js) if production else js
+
+    def search(results: dict) -> tuple:
+        data, _ = results['content']
+        with stage('search index', 'search'):
+            search_js = generate_search_js()
+            return (build_search_index(search_documents(data, page_size)),
+                    minify_js(search_js) if production else search_js)
+
+    def probe(results: dict) -> tuple:
+        data, _ = results['content']
+        if not data_images_dir.exists():
+            echo(f'  Warning: {data_images_dir} directory not found')
+        echo('Resolving page images...')
+        with stage('probe images', 'image'):
+            digests = {name: source_digest(data_images_dir / name, results['output'],
+                                           seen_sources)
+                       for name in image_roles(data) if (data_images_dir / name).is_file()}
+            return digests, probe_images(data_images_dir, digests)
+
+    def derive(results: dict) -> dict:
+        if not responsive_images:
+            return {}
+        if Image is None:
+            echo('  Pillow is not installed; skipping responsive image variants')
+            return {}
+        data, _ = results['content']
+        digests, _ = results['probe']
+        with stage('derive images', 'image'):
+            return derive_images([(name, data_images_dir / name, digest, role)
+                                  for name, role in image_roles(data).items()
+                                  for digest in [digests.get(name)] if digest],
+                                 profiler=profiler)
+
+    def render_icons(results: dict) -> tuple | None:
+        data, _ = results['content']
+        if not data.profile.icon:
+            return None
+        icon_path = data_dir / data.profile.icon
+        if Image is None:
+            echo('  Pillow is not installed; using the icon files in data/images')
+            return None
+        if not icon_path.is_file():
+            echo(f'  Warning: icon not found at {icon_path}')
+            return None
+        echo('Rendering icons...')
+        with stage('render icons', 'image'):
+            digest = source_digest(icon_path, results['output'], seen_sources)
+            return derive_icons(icon_path, digest)
+
+    def plan(results: dict) -> dict:
+        data, content_hash = results['content']
+        manifest = results['output']
+        css, critical_css = results['styles']
+        js = results['scripts']
+        search_index, search_js = results['search']
+        image_sizes = results['probe'][1]
+        derivatives = results['derive']
+        icon_dir, icon_files = results['icons'] or (None, {})
+        icons = {size: f'images/icons/{name}' for size, name in icon_files.items()} or None
+        urls = {}
+        if fingerprint:
+            urls['style.css'] = fingerprint_name('style.css', text_digest(css))
+            urls['script.js'] = fingerprint_name('script.js', text_digest(js))
+            urls[SEARCH_INDEX] = fingerprint_name(SEARCH_INDEX, text_digest(search_index))
+            urls[SEARCH_SCRIPT] = fingerprint_name(SEARCH_SCRIPT, text_digest(search_js))
+        css_name = urls.get('style.css', 'style.css')
+        js_name = urls.get('script.js', 'script.js')
+        search_name = urls.get(SEARCH_INDEX, SEARCH_INDEX)
+        search_js_name = urls.get(SEARCH_SCRIPT, SEARCH_SCRIPT)
+        with stage('resolve references', 'manifest'):
+            published, missing = referenced_assets(data, data_images_dir, image_sizes, derivatives,
+                                                   static_icons=icons is None)
+        for name in missing:
+            echo(f'  Warning: referenced asset not found: {name}')
+        if icons:
+            documents = {WEB_MANIFEST, BROWSERCONFIG}
         else:
-            print(f'Warning: Resume not found at {resume_path}')
-    print('\nPortfolio generated successfully!')
+            documents = published & {WEB_MANIFEST, BROWSERCONFIG} if fingerprint else set()
+        assets = [(data_images_dir / name, f'images/{name}') for name in sorted(published - documents)]
+        if derivatives:
+            (docs_images_dir / 'derived').mkdir(exist_ok=True)
+            assets += [(out_dir / variant['file'], f"images/derived/{variant['file']}")
+                       for out_dir, variants in derivatives.values() for variant in variants]
+        if icons:
+            (docs_images_dir / 'icons').mkdir(exist_ok=True)
+            assets += [(icon_dir / name, icons[size]) for size, name in sorted(icon_files.items())]
+        if fingerprint:
+            with stage('fingerprint assets', 'manifest'):
+                for source, name in assets:
+                    digest = source_digest(source, manifest, seen_sources)
+                    urls[name] = fingerprint_name(name, digest)
+            assets = [(source, urls[name]) for source, name in assets]
+        static_text = [css_name, js_name, search_name, search_js_name]
+        static_text += [name for _, name in assets if Path(name).suffix in COMPRESSIBLE_SUFFIXES]
+        if data.profile.resume:
+            resume_path = data_dir / data.profile.resume
+            if resume_path.exists():
+                assets.append((resume_path, resume_path.name))
+            else:
+                echo(f'Warning: Resume not found at {resume_path}')
+        resources: list[tuple[str, str, Callable[[], str]]] = []
+        for name in sorted(documents):
+            if not icons:
+                text = rewrite_references(data_images_dir / name, 'images', urls)
+            elif name == WEB_MANIFEST:
+                text = render_web_manifest(data, icons, urls)
+            else:
+                text = render_browserconfig(icons, urls)
+            output = f'images/{name}'
+            if fingerprint:
+                urls[output] = fingerprint_name(output, text_digest(text))
+                output = urls[output]
+            static_text.append(output)
+            resources.append((output, text_digest(text), rendered(text)))
+        resources += [
+            (css_name, generator_hash, rendered(css)),
+            (js_name, generator_hash, rendered(js)),
+            (search_name, text_digest(search_index), rendered(search_index)),
+            (search_js_name, generator_hash, rendered(search_js)),
+        ]
+        view_key = text_digest(generator_hash, json.dumps(image_sizes, sort_keys=True),
+                               json.dumps({name: v for name, (_, v) in derivatives.items()},
+                                          sort_keys=True),
+                               json.dumps(urls, sort_keys=True), json.dumps(icons, sort_keys=True),
+                               str(page_size))
+        recorders = {'index.html': FragmentRecorder(fragments)}
+        pages: list[tuple[str, str, Callable[[], Iterable[str]]]] = [
+            ('index.html', text_digest(view_key, content_hash),
+             functools.partial(render_html, data, recorders['index.html'],
+                               critical_css=critical_css, images=image_sizes,
+                               derivatives=derivatives, urls=urls, icons=icons,
+                               profiler=profiler, page_size=page_size))]
+        shared_key = text_digest(view_key, repr((data.profile, data.contact, data.education)))
+        for page in archive_pages(data, page_size):
+            (docs_dir / page['kind']).mkdir(exist_ok=True)
+            page_key = text_digest(shared_key, page['name'], str(page['count']),
+                                   repr(page['entries']))
+            recorders[page['name']] = FragmentRecorder(fragments)
+            pages.append((page['name'], page_key,
+                          functools.partial(render_archive, data, page, recorders[page['name']],
+                                            critical_css=critical_css, images=image_sizes,
+                                            derivatives=derivatives, urls=urls, icons=icons)))
+        return {'urls': urls, 'published': published, 'assets': assets, 'resources': resources,
+                'pages': pages, 'recorders': recorders, 'static_text': static_text}
+
+    def copy(results: dict) -> dict:
+        assets = results['plan']['assets']
+        echo(f'Copying {len(assets)} referenced assets...')
+        with stage('copy assets', 'copy', files=len(assets)):
+            copied = copy_assets(docs_dir, assets, results['output'], hardlink=hardlink,
+                                 profiler=profiler, fsync=fsync)
+        copy_count = sum(1 for was_copied, _ in copied.values() if was_copied)
+        echo(f'  Copied {copy_count} files, {len(copied) - copy_count} up to date')
+        return copied
+
+    def write_resources(results: dict) -> dict:
+        resources = results['plan']['resources']
+        echo(f'Writing {len(resources)} stylesheets, scripts and documents...')
+        with stage('write resources', 'write', files=len(resources)):
+            return write_outputs(docs_dir, resources, results['output'], fsync=fsync,
+                                 profiler=profiler)
+
+    def write_pages(results: dict) -> tuple:
+        pages = results['plan']['pages']
+        echo(f'Generating {len(pages)} HTML pages...')
+        hits, misses = fragments.hits, fragments.misses
+        with stage('write pages', 'write', files=len(pages)):
+            wrote = write_outputs(docs_dir, pages, results['output'], fsync=fsync,
+                                  profiler=profiler)
+        page_fragments = results['output']['fragments']
+        for name, recorder in results['plan']['recorders'].items():
+            if recorder.keys:
+                page_fragments[name] = sorted(recorder.keys)
+            else:
+                fragments.touch(page_fragments.get(name, ()))
+        counts = {'reused': fragments.hits - hits, 'rendered': fragments.misses - misses}
+        if counts['reused'] or counts['rendered']:
+            echo(f"  Reused {counts['reused']} cached sections and cards, "
+                 f"rendered {counts['rendered']}")
+        return wrote, counts
+
+    def precompress(names: list, results: dict, announce: bool = False) -> list:
+        if not compress:
+            return []
+        if announce:
+            echo('Precompressing text outputs...')
+        with stage('compress', 'compress', files=len(names)):
+            return compress_outputs(docs_dir, names, results['output'], profiler=profiler,
+                                    fsync=fsync)
+
+    def finish(results: dict) -> dict:
+        manifest = results['output']
+        urls = results['plan']['urls']
+        copied = results['copy']
+        pages, fragment_counts = results['write pages']
+        wrote = {**results['write resources'], **pages}
+        text_outputs = results['plan']['static_text'] + list(pages)
+        copy_count = sum(1 for was_copied, _ in copied.values() if was_copied)
+        result = {'written': copy_count + sum(wrote.values()),
+                  'skipped': len(copied) - copy_count + len(wrote) - sum(wrote.values()),
+                  'fragments': fragment_counts}
+        produced = {*text_outputs, *copied}
+        if compress:
+            report = results['compress static'] + results['compress pages']
+            for row in report:
+                result['written'] += row['written']
+                result['skipped'] += len(precompressors()) - row['written']
+            result['compression'] = report
+            produced.update(name + suffix for name in text_outputs
+                            for suffix, _, _ in precompressors())
+            if verbose:
+                print_compression_report(report)
+        if fingerprint:
+            echo('Writing cache headers...')
+            headers = cache_headers(produced, set(urls.values()))
+            for name, text in ((HEADERS_FILE, headers), (NGINX_SNIPPET, nginx_cache_snippet())):
+                if write_output(docs_dir, name, text_digest(text), rendered(text), manifest, fsync):
+                    result['written'] += 1
+                else:
+                    result['skipped'] += 1
+                produced.add(name)
+        if prune:
+            data, _ = results['content']
+            kept = results['plan']['published'] | results['derive'].keys()
+            if results['icons']:
+                kept.add(os.path.relpath(data_dir / data.profile.icon, data_images_dir))
+            dropped = sorted(path.name for path in data_images_dir.glob('*')
+                             if path.is_file() and path.name not in kept)
+            with stage('prune', 'manifest'):
+                removed = prune_outputs(docs_dir, produced, manifest)
+            result['dropped'] = dropped
+            result['removed'] = removed
+            if dropped:
+                echo(f"Not publishing {len(dropped)} unreferenced files: {', '.join(dropped)}")
+            if removed:
+                echo(f"Removed {len(removed)} stale outputs: {', '.join(removed)}")
+            if fragment_store is not None and prune_fragments:
+                with stage('prune fragments', 'manifest'):
+                    pruned = prune_fragment_store(fragment_store, started)
+                if pruned:
+                    echo(f'Removed {pruned} unused fragments from {fragment_store}')
+        with stage('output manifest', 'manifest'):
+            site_files = output_manifest(docs_dir, produced, manifest)
+        if delta is not None:
+            if delta_base is not None:
+                base = json.loads(delta_base.read_text(encoding='utf-8'))['files']
+            else:
+                base = manifest['published']
+            changes = deploy_delta(base, site_files)
+            with stage('write delta', 'write'):
+                write_delta(docs_dir, delta, changes, site_files, fsync)
+            upload = sum(site_files[name]['size'] for name in changes['added'] + changes['changed'])
+            result['delta'] = {**{kind: len(names) for kind, names in changes.items()},
+                               'bytes': upload}
+            echo(f"Deploy delta: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+                 f"{len(changes['removed'])} removed, {upload:,} bytes to upload, in {delta}")
+        manifest['published'] = site_files
+        manifest['sources'] = {name: entry for name, entry in manifest['sources'].items()
+                               if name in seen_sources}
+        manifest['fragments'] = {name: keys for name, keys in manifest['fragments'].items()
+                                 if name in pages}
+        with stage('save manifest', 'manifest'):
+            save_manifest(manifest_file, manifest, fsync)
+        return result
+
+    stages = {
+        'content': ((), load),
+        'output': ((), prepare_output),
+        'styles': ((), styles),
+        'scripts': ((), scripts),
+        'search': (('content',), search),
+        'probe': (('content', 'output'), probe),
+        'derive': (('content', 'probe'), derive),
+        'icons': (('content', 'output'), render_icons),
+        'plan': (('content', 'output', 'styles', 'scripts', 'search', 'probe', 'derive', 'icons'),
+                 plan),
+        'copy': (('plan',), copy),
+        'write resources': (('plan',), write_resources),
+        'compress static': (('copy', 'write resources'),
+                            lambda results: precompress(results['plan']['static_text'], results,
+                                                        announce=True)),
+        'write pages': (('copy', 'write resources'), write_pages),
+        'compress pages': (('write pages',),
+                           lambda results: precompress(list(results['write pages'][0]), results)),
+        'finish': (('compress static', 'compress pages'), finish),
+    }
+    return run_stages(stages, concurrency)['finish']
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def start_generation(docs_dir: Path) -> Path:
+    """Create the next generation directory for docs_dir.
+
+    Generations live in a hidden .<name>.generations directory beside
+    docs_dir and are numbered in build order. The new one is seeded with
+    hardlinks to the live output, so the build stays incremental; this is
+    safe because every write replaces files instead of editing them.
+
+    Returns:
+        Path of the new, not yet published generation.
+    """
+    root = docs_dir.with_name(f'.{docs_dir.name}.generations')
+    root.mkdir(parents=True, exist_ok=True)
+    numbers = [int(path.name) for path in root.iterdir() if path.name.isdigit()]
+    generation = root / str(max(numbers, default=0) + 1)
+    if docs_dir.is_dir():
+        shutil.copytree(docs_dir, generation, symlinks=True, copy_function=_link_or_copy)
+    else:
+        generation.mkdir()
+    return generation
+
+
+def publish_generation(docs_dir: Path, generation: Path, keep: int = GENERATIONS_KEPT) -> None:
+    """Atomically point docs_dir at a finished generation.
+
+    docs_dir becomes (or stays) a relative symlink, replaced with a single
+    rename, so a server following it sees either the whole old site or the
+    whole new one. A plain directory already at docs_dir is moved aside as
+    generation 0 first; that one-time move is the only moment docs_dir is
+    missing. Only the newest keep generations are left on disk, so the
+    previous one remains available to roll back to.
+    """
+    root = generation.parent
+    if docs_dir.is_dir() and not docs_dir.is_symlink():
+        shutil.rmtree(root / '0', ignore_errors=True)
+        os.rename(docs_dir, root / '0')
+    link = docs_dir.with_name(f'.{docs_dir.name}.link')
+    link.unlink(missing_ok=True)
+    os.symlink(os.path.relpath(generation, docs_dir.parent), link, target_is_directory=True)
+    os.replace(link, docs_dir)
+    numbered = sorted((path for path in root.iterdir() if path.name.isdigit()),
+                      key=lambda path: int(path.name))
+    for old in numbered[:-keep]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def build_generation(content_path: Path = CONTENT_FILE, docs_dir: Path = DOCS_DIR,
+                     **options) -> dict:
+    """Build into a fresh generation and swap docs_dir over to it.
+
+    Takes the same options as build_site. If the build fails, the live
+    site is left untouched and the partial generation is removed.
+
+    Returns:
+        build_site's result, plus the published 'generation' directory.
+    """
+    generation = start_generation(docs_dir)
+    try:
+        result = build_site(content_path, generation, published_dir=docs_dir, **options)
+    except BaseException:
+        shutil.rmtree(generation, ignore_errors=True)
+        raise
+    publish_generation(docs_dir, generation)
+    result['generation'] = str(generation)
+    return result
+
+
+def find_tenants(source: Path, output_root: Path) -> list:
+    """Collect the portfolios to build in batch mode.
+
+    Args:
+        source: Either a directory whose subdirectories each hold a
+            content.yaml (built into output_root/<subdirectory name>), or a
+            YAML/JSON manifest listing entries with 'name', 'content' and
+            optionally 'output' keys (defaulting to output_root/<name>).
+            Relative paths in a manifest are resolved against the
+            manifest's directory.
+        output_root: Root directory for tenant outputs.
+
+    Returns:
+        List of (name, content_path, docs_dir) tuples.
+    """
+    if source.is_dir():
+        return [(sub.name, sub / 'content.yaml', output_root / sub.name)
+                for sub in sorted(source.iterdir())
+                if (sub / 'content.yaml').is_file()]
+    with open(source, 'r', encoding='utf-8') as f:
+        entries = yaml.safe_load(f) or []
+    tenants = []
+    for entry in entries:
+        name = entry['name']
+        output = source.parent / entry['output'] if 'output' in entry else output_root / name
+        tenants.append((name, source.parent / entry['content'], output))
+    return tenants
+
+
+def _init_batch_worker() -> None:
+    """Warm per-process state once, before the worker's first tenant."""
+    generator_digest()
+    yaml.load('warm: true', Loader=SafeLoader)
+    for path in TEMPLATE_DIR.glob('*.html'):
+        load_template(path.name)
+
+
+def _build_tenant(name: str, content_path: Path, docs_dir: Path, options: dict) -> dict:
+    """Build one tenant inside a batch worker, capturing any failure.
+
+    Returns:
+        Result dictionary with the tenant name, timing and outcome.
+    """
+    start = time.perf_counter()
+    result: dict = {'name': name, 'content': str(content_path), 'output': str(docs_dir)}
+    options = dict(options)
+    profiler = BuildProfiler() if options.pop('profile', False) else None
+    build = build_generation if options.pop('swap', False) else build_site
+    if options.get('delta') is not None:
+        options['delta'] = Path(options['delta']) / name
+    if options.get('delta_base') is not None:
+        base = Path(options['delta_base']) / name / DELTA_LIST
+        options['delta_base'] = base if base.is_file() else None
+    try:
+        result.update(build(content_path, docs_dir, verbose=False, profiler=profiler, **options))
+        result['ok'] = True
+    except Exception as e:
+        result['ok'] = False
+        result['error'] = f'{type(e).__name__}: {e}'
+        result['traceback'] = traceback.format_exc()
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    if profiler is not None:
+        result['profile'] = profiler.stages
+    return result
+
+
+def build_batch(tenants: list, jobs: int | None = None, **options) -> list:
+    """Build many portfolios in parallel on a process pool.
+
+    A failing tenant is reported and does not stop the rest of the batch.
+
+    Args:
+        tenants: List of (name, content_path, docs_dir) tuples.
+        jobs: Number of worker processes (defaults to the CPU count).
+        options: Keyword arguments passed on to build_site for every tenant,
+            plus 'profile' to record a BuildProfiler for each of them.
+            'delta' and 'delta_base' are directories with one subdirectory
+            per tenant; a tenant without a delta.json under delta_base is
+            compared against its previous build. A 'fragment_store' shared
+            by the tenants is pruned once, after all of them are built.
+
+    Returns:
+        Per-tenant result dictionaries, in completion order.
+    """
+    started = time.time()
+    store = options.get('fragment_store')
+    options['prune_fragments'] = False
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker) as pool:
+        futures = [pool.submit(_build_tenant, name, content_path, docs_dir, options)
+                   for name, content_path, docs_dir in tenants]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['ok']:
+                print(f"  {result['name']}: {result['seconds']:.3f}s "
+                      f"({result['written']} written, {result['skipped']} up to date)")
+            else:
+                print(f"  {result['name']}: FAILED after {result['seconds']:.3f}s - {result['error']}")
+    if store is not None and options.get('prune', True):
+        pruned = prune_fragment_store(store, started)
+        if pruned:
+            print(f'Removed {pruned} unused fragments from {store}')
+    return results
+
+
+def positive_int(value: str) -> int:
+    """Argparse type for options that need a whole number of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be a positive integer, not {value!r}')
+    return number
+
+
+def main() -> None:
+    """Main function to generate the portfolio site."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--content', type=Path, default=CONTENT_FILE,
+                        help='content YAML file (default: %(default)s)')
+    parser.add_argument('--output', type=Path, default=DOCS_DIR,
+                        help='output directory (default: %(default)s)')
+    parser.add_argument('--force', action='store_true',
+                        help='ignore the build manifest and rebuild everything')
+    parser.add_argument('--no-compress', dest='compress', action='store_false',
+                        help='skip writing precompressed .gz/.br siblings')
+    parser.add_argument('--production', action='store_true',
+                        help='minify assets and inline critical CSS')
+    parser.add_argument('--no-responsive-images', dest='responsive_images', action='store_false',
+                        help='skip encoding resized image variants')
+    parser.add_argument('--hardlink', action='store_true',
+                        help='hardlink assets into the output instead of copying them')
+    parser.add_argument('--no-prune', dest='prune', action='store_false',
+                        help='keep stale and unreferenced files in the output')
+    parser.add_argument('--fingerprint', action='store_true',
+                        help='publish assets under content-hashed names with immutable caching')
+    parser.add_argument('--page-size', type=positive_int, default=ARCHIVE_PAGE_SIZE,
+                        help='entries per archive page (default: %(default)s)')
+    parser.add_argument('--profile', type=Path, nargs='?', const=Path('build-profile.json'),
+                        metavar='PATH',
+                        help='record per-stage timings, I/O and peak memory to PATH '
+                             '(default: %(const)s) and a Chrome trace next to it; '
+                             'memory tracing slows the build down')
+    parser.add_argument('--fsync', choices=FSYNC_MODES, default='none',
+                        help="flush outputs to disk before publishing them: 'files' flushes "
+                             "each file, 'full' also its directory (default: %(default)s)")
+    parser.add_argument('--delta', type=Path, metavar='DIR',
+                        help='write delta.json and delta.tar.gz with the files changed since '
+                             'the previous build to DIR (per tenant in batch mode)')
+    parser.add_argument('--delta-base', type=Path, metavar='DELTA_JSON',
+                        help='compare against the files listed in an earlier delta.json '
+                             'instead of the previous build (in batch mode, an earlier '
+                             '--delta DIR holding one delta per tenant)')
+    parser.add_argument('--fragment-store', type=Path, nargs='?', const=CACHE_DIR / 'fragments',
+                        metavar='DIR',
+                        help='persist rendered sections and cards in DIR (default: %(const)s) '
+                             'and reuse them across builds and batch workers')
+    parser.add_argument('--concurrency', type=positive_int, default=BUILD_CONCURRENCY,
+                        help='build stages to run at once (default: %(default)s)')
+    parser.add_argument('--swap', action='store_true',
+                        help='build into a new generation directory and atomically repoint '
+                             'the output, which becomes a symlink, at it')
+    commands = parser.add_subparsers(dest='command')
+    batch = commands.add_parser('batch', help='build many portfolios in parallel')
+    batch.add_argument('source', type=Path,
+                       help='directory of <name>/content.yaml folders, or a YAML/JSON manifest')
+    batch.add_argument('--output-root', type=Path, default=Path('build'),
+                       help='root directory for tenant outputs (default: %(default)s)')
+    batch.add_argument('--jobs', type=positive_int, default=None,
+                       help='worker processes (default: CPU count)')
+    batch.add_argument('--report', type=Path,
+                       help='write per-tenant results to this JSON file')
+    preview = commands.add_parser('serve', help='serve the built output as a production host '
+                                               'would: ETags, precompressed files and ranges')
+    preview.add_argument('--host', default='127.0.0.1',
+                         help='interface to listen on (default: %(default)s)')
+    preview.add_argument('--port', type=int, default=8000,
+                         help='port to listen on (default: %(default)s)')
+    preview.add_argument('--quiet', action='store_true',
+                         help='skip the per-request log; the latency summary is still printed')
+    watch = commands.add_parser('watch', help='serve the site and rebuild on every change')
+    watch.add_argument('--port', type=int, default=8000,
+                       help='preview server port (default: %(default)s)')
+    watch.add_argument('--interval', type=float, default=0.05,
+                       help='seconds between polls for changes (default: %(default)s)')
+    args = parser.parse_args()
+    if args.command == 'watch':
+        import serve
+        serve.watch(args.content, args.output, port=args.port, interval=args.interval)
+        return
+    if args.command == 'serve':
+        import serve
+        serve.serve(args.output, host=args.host, port=args.port, log=not args.quiet)
+        return
+    if args.command == 'batch':
+        tenants = find_tenants(args.source, args.output_root)
+        print(f'Building {len(tenants)} portfolios with {args.jobs or os.cpu_count()} workers...')
+        start = time.perf_counter()
+        results = build_batch(tenants, jobs=args.jobs, force=args.force,
+                              compress=args.compress, production=args.production,
+                              responsive_images=args.responsive_images, hardlink=args.hardlink,
+                              prune=args.prune, fingerprint=args.fingerprint,
+                              page_size=args.page_size, fsync=args.fsync, swap=args.swap,
+                              delta=args.delta, delta_base=args.delta_base,
+                              fragment_store=args.fragment_store, concurrency=args.concurrency,
+                              profile=args.profile is not None)
+        failed = [r for r in results if not r['ok']]
+        print(f'\nBuilt {len(results) - len(failed)}/{len(results)} portfolios '
+              f'in {time.perf_counter() - start:.2f}s')
+        if args.profile:
+            runs = {result['name']: result.pop('profile', []) for result in results}
+            trace_path = write_profile(args.profile, runs)
+            print(f'Profile written to {args.profile} and {trace_path}')
+        for result in failed:
+            print(f"\n{result['name']} failed:\n{result['traceback']}")
+        if args.report:
+            results.sort(key=lambda r: r['name'])
+            args.report.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+        sys.exit(1 if failed else 0)
+    profiler = BuildProfiler() if args.profile else None
+    build = build_generation if args.swap else build_site
+    try:
+        counts = build(args.content, args.output, force=args.force, compress=args.compress,
+                       production=args.production, responsive_images=args.responsive_images,
+                       hardlink=args.hardlink, prune=args.prune, fingerprint=args.fingerprint,
+                       profiler=profiler, page_size=args.page_size, fsync=args.fsync,
+                       delta=args.delta, delta_base=args.delta_base,
+                       fragment_store=args.fragment_store, concurrency=args.concurrency)
+    except ContentError as e:
+        sys.exit(f'Invalid content: {e}')
+    docs_dir = args.output
+    if profiler is not None:
+        print('\nSlowest stages:')
+        print_profile(profiler.stages)
+        trace_path = write_profile(args.profile, {str(docs_dir): profiler.stages})
+        print(f'Profile written to {args.profile} and {trace_path}')
+    print(f"\nPortfolio generated successfully! ({counts['written']} written, "
+          f"{counts['skipped']} up to date)")
     print(f'Output location: {docs_dir.absolute()}')
-    print('\nTo preview locally, open docs/index.html in your browser')
+    output = '' if docs_dir == DOCS_DIR else f' --output {docs_dir}'
+    print(f'\nTo preview it as it will be served, run "python generate.py{output} serve"')
+    print(f'or run "python generate.py{output} watch" for a live-reloading preview server')
     print('To deploy to GitHub Pages:')
     print('  1. Commit and push all files')
     print('  2. Go to repository Settings > Pages')
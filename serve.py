@@ -0,0 +1,678 @@
+"""Watch mode and local preview servers for the portfolio generator."""
+
+import asyncio
+import importlib
+import mimetypes
+import os
+import queue
+import re
+import statistics
+import threading
+from collections import OrderedDict
+import time
+import traceback
+import urllib.parse
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import generate
+
+LIVERELOAD_PATH = '/__livereload'
+LIVERELOAD_SCRIPT = '''<script>
+new EventSource('/__livereload').onmessage = function(event) {
+    if (event.data === 'css') {
+        document.querySelectorAll('link[rel="stylesheet"]').forEach(function(link) {
+            link.href = link.href.replace(/\\?.*$/, '') + '?' + Date.now();
+        });
+    } else {
+        location.reload();
+    }
+};
+</script>
+'''
+SERVE_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+SERVE_IDLE_TIMEOUT = 15.0
+SERVE_ETAG_ENTRIES = 4096
+SERVE_DEFAULT_CACHE_CONTROL = 'no-cache'
+_BYTE_RANGE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+class LiveReloadHub:
+    """Fans reload events out to every connected browser."""
+
+    def __init__(self) -> None:
+        self._clients: list[queue.Queue] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> queue.Queue:
+        """Register a client and return the queue its events arrive on."""
+        client: queue.Queue = queue.Queue()
+        with self._lock:
+            self._clients.append(client)
+        return client
+
+    def unsubscribe(self, client: queue.Queue) -> None:
+        """Forget a disconnected client."""
+        with self._lock:
+            self._clients.remove(client)
+
+    def publish(self, event: str) -> None:
+        """Send an event ('reload' or 'css') to all clients."""
+        with self._lock:
+            for client in self._clients:
+                client.put(event)
+
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    """Static file handler that injects the live-reload client into pages."""
+
+    def __init__(self, *args, hub: LiveReloadHub, **kwargs) -> None:
+        self.hub = hub
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        """Serve live-reload events, HTML with the client injected, or files."""
+        if self.path == LIVERELOAD_PATH:
+            self._stream_events()
+            return
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            path = path / 'index.html'
+        if path.suffix != '.html' or not path.is_file():
+            super().do_GET()
+            return
+        body = path.read_bytes().replace(b'</body>', LIVERELOAD_SCRIPT.encode('utf-8') + b'</body>', 1)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def end_headers(self) -> None:
+        """Disable browser caching so every reload sees fresh output."""
+        if self.path != LIVERELOAD_PATH:
+            self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+
+    def log_message(self, format: str, *args) -> None:
+        """Keep the console for rebuild messages."""
+
+    def _stream_events(self) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        client = self.hub.subscribe()
+        try:
+            while True:
+                try:
+                    self.wfile.write(f'data: {client.get(timeout=15)}\n\n'.encode('utf-8'))
+                except queue.Empty:
+                    self.wfile.write(b': keepalive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.hub.unsubscribe(client)
+
+
+class FragmentMemo:
+    """Fragment cache that keeps only what the latest render used.
+
+    Implements the ``get``/item-assignment interface expected by
+    generate.render_fragment, and records which fragments had to be
+    rendered so the watcher can report them.
+    """
+
+    def __init__(self) -> None:
+        self.previous: dict[str, str] = {}
+        self.current: dict[str, str] = {}
+        self.rendered: list[str] = []
+
+    def get(self, key: str):
+        """Look up a fragment from the current or the previous render."""
+        html = self.current.get(key)
+        if html is None:
+            html = self.previous.get(key)
+            if html is not None:
+                self.current[key] = html
+        return html
+
+    def __setitem__(self, key: str, html: str) -> None:
+        self.current[key] = html
+        self.rendered.append(key)
+
+    def rotate(self) -> None:
+        """Start a new render, dropping fragments the last one didn't use."""
+        self.previous, self.current, self.rendered = self.current, {}, []
+
+    def clear(self) -> None:
+        """Forget every fragment."""
+        self.previous, self.current, self.rendered = {}, {}, []
+
+
+def _drop_precompressed(path: Path) -> None:
+    """Remove a file's .gz/.br siblings, which no longer match it.
+
+    The next full build compresses the file again; until then the file
+    is served uncompressed rather than stale.
+    """
+    for _, suffix in SERVE_ENCODINGS:
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def _publish(path: Path, text: str) -> None:
+    """Replace a file's contents without exposing a partial write."""
+    generate.write_atomic(path, text.encode('utf-8'))
+    _drop_precompressed(path)
+
+
+def _scan(path: Path, stats: dict) -> None:
+    """Record (mtime, size) for a file or everything below a directory."""
+    try:
+        if path.is_file():
+            stat = path.stat()
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+            return
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    _scan(Path(entry.path), stats)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    stats[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        pass
+
+
+class SiteWatcher:
+    """Applies source changes to a built site, re-rendering as little as possible."""
+
+    def __init__(self, content_path: Path, docs_dir: Path) -> None:
+        self.content_path = content_path.resolve()
+        self.data_dir = self.content_path.parent
+        self.images_dir = self.data_dir / 'images'
+        self.docs_dir = docs_dir
+        self.generator_path = Path(generate.__file__).resolve()
+        self.fragments = FragmentMemo()
+        self.css = generate.generate_css()
+        self.js = generate.generate_js()
+        self.search_js = generate.generate_search_js()
+        self.search_index = self._search_index()
+        self.images = generate.probe_images(self.images_dir)
+        self.derivatives = self._derive()
+        self.icons = self._derive_icons()
+        self.pages = self.render_pages()
+
+    def snapshot(self) -> dict:
+        """Stat every watched file."""
+        stats: dict[Path, tuple] = {}
+        _scan(self.data_dir, stats)
+        _scan(self.generator_path, stats)
+        _scan(generate.TEMPLATE_DIR, stats)
+        return stats
+
+    def _resume_path(self):
+        resume = generate.load_content(self.content_path).profile.resume
+        return self.data_dir / resume if resume else None
+
+    def _search_index(self) -> str:
+        data = generate.load_content(self.content_path)
+        return generate.build_search_index(generate.search_documents(data))
+
+    def _derive(self) -> dict:
+        """Encode (or fetch from cache) responsive variants and publish them."""
+        if generate.Image is None:
+            return {}
+        data = generate.load_content(self.content_path)
+        derivatives = generate.derive_images([
+            (name, self.images_dir / name, generate.file_digest(self.images_dir / name), role)
+            for name, role in generate.image_roles(data).items()
+            if (self.images_dir / name).is_file()])
+        (self.docs_dir / 'images' / 'derived').mkdir(parents=True, exist_ok=True)
+        for out_dir, variants in derivatives.values():
+            for variant in variants:
+                target = self.docs_dir / 'images' / 'derived' / variant['file']
+                if not target.exists():
+                    generate._copy_file(out_dir / variant['file'], target, hardlink=False)
+        return derivatives
+
+    def _derive_icons(self):
+        """Render (or fetch from cache) the icon set and publish it with its documents."""
+        data = generate.load_content(self.content_path)
+        master = data.profile.icon
+        if not master or generate.Image is None or not (self.data_dir / master).is_file():
+            return None
+        out_dir, files = generate.derive_icons(self.data_dir / master,
+                                               generate.file_digest(self.data_dir / master))
+        icons = {size: f'images/icons/{name}' for size, name in files.items()}
+        (self.docs_dir / 'images' / 'icons').mkdir(parents=True, exist_ok=True)
+        for size, name in files.items():
+            generate._copy_file(out_dir / name, self.docs_dir / icons[size], hardlink=False)
+        _publish(self.docs_dir / 'images' / generate.WEB_MANIFEST,
+                 generate.render_web_manifest(data, icons, {}))
+        _publish(self.docs_dir / 'images' / generate.BROWSERCONFIG,
+                 generate.render_browserconfig(icons, {}))
+        return icons
+
+    def render_pages(self) -> dict:
+        """Render index.html and the archive pages, reusing every unchanged fragment."""
+        self.fragments.rotate()
+        data = generate.load_content(self.content_path)
+        view = {'images': self.images, 'derivatives': self.derivatives, 'icons': self.icons}
+        pages = {'index.html': ''.join(generate.render_html(data, self.fragments, **view))}
+        for page in generate.archive_pages(data):
+            pages[page['name']] = ''.join(generate.render_archive(data, page, self.fragments, **view))
+        return pages
+
+    def apply(self, changed: set) -> list:
+        """Bring the output up to date with a set of changed source files.
+
+        Args:
+            changed: Paths that were added, modified or removed.
+
+        Returns:
+            Human-readable descriptions of what was updated. Empty if the
+            output is unaffected.
+        """
+        updates = []
+        page_stale = False
+        for path in sorted(changed):
+            if path == self.generator_path:
+                importlib.reload(generate)
+                self.fragments.clear()
+                page_stale = True
+                css, js = generate.generate_css(), generate.generate_js()
+                if css != self.css:
+                    self.css = css
+                    _publish(self.docs_dir / 'style.css', css)
+                    updates.append('style.css')
+                if js != self.js:
+                    self.js = js
+                    _publish(self.docs_dir / 'script.js', js)
+                    updates.append('script.js')
+                search_js = generate.generate_search_js()
+                if search_js != self.search_js:
+                    self.search_js = search_js
+                    _publish(self.docs_dir / generate.SEARCH_SCRIPT, search_js)
+                    updates.append(generate.SEARCH_SCRIPT)
+            elif path.parent == generate.TEMPLATE_DIR:
+                generate._templates.pop(path.name, None)
+                page_stale = True
+            elif path == self.content_path:
+                roles = generate.image_roles(generate.load_content(self.content_path))
+                if roles.keys() != self.derivatives.keys() and generate.Image is not None:
+                    self.derivatives = self._derive()
+                self.icons = self._derive_icons()
+                search_index = self._search_index()
+                if search_index != self.search_index:
+                    self.search_index = search_index
+                    _publish(self.docs_dir / generate.SEARCH_INDEX, search_index)
+                    updates.append(generate.SEARCH_INDEX)
+                page_stale = True
+            elif path.parent == self.images_dir or path == self._resume_path():
+                name = f'images/{path.name}' if path.parent == self.images_dir else path.name
+                target = self.docs_dir / name
+                if path.exists():
+                    generate._copy_file(path, target, hardlink=False)
+                else:
+                    target.unlink(missing_ok=True)
+                _drop_precompressed(target)
+                updates.append(name)
+                if path.parent == self.images_dir:
+                    self.images = generate.probe_images(self.images_dir)
+                    self.derivatives = self._derive()
+                    self.icons = self._derive_icons()
+                    page_stale = True
+        if page_stale:
+            pages = self.render_pages()
+            stale = [name for name, html in pages.items() if self.pages.get(name) != html]
+            for name in stale:
+                (self.docs_dir / name).parent.mkdir(exist_ok=True)
+                _publish(self.docs_dir / name, pages[name])
+            for name in sorted(self.pages.keys() - pages.keys()):
+                (self.docs_dir / name).unlink(missing_ok=True)
+                _drop_precompressed(self.docs_dir / name)
+                updates.append(f'{name} (removed)')
+            if stale:
+                rendered = sorted({key.split(':')[0] for key in self.fragments.rendered})
+                updates.append(f"{', '.join(stale)} ({', '.join(rendered) or 'layout'})")
+            self.pages = pages
+        return updates
+
+
+def watch(content_path: Path, docs_dir: Path, port: int = 8000, interval: float = 0.05) -> None:
+    """Build the site, serve it, and rebuild incrementally on every change.
+
+    Args:
+        content_path: Content YAML file to build from.
+        docs_dir: Output directory to build into and serve.
+        port: Port for the preview server.
+        interval: Seconds between polls of the watched files.
+    """
+    generate.build_site(content_path, docs_dir)
+    hub = LiveReloadHub()
+    handler = partial(PreviewHandler, directory=str(docs_dir), hub=hub)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    watcher = SiteWatcher(content_path, docs_dir)
+    print(f'\nServing {docs_dir} at http://127.0.0.1:{port}/')
+    print('Watching for changes (Ctrl+C to stop)...')
+    previous = watcher.snapshot()
+    try:
+        while True:
+            time.sleep(interval)
+            current = watcher.snapshot()
+            changed = {path for path in previous.keys() | current.keys()
+                       if previous.get(path) != current.get(path)}
+            previous = current
+            if not changed:
+                continue
+            start = time.perf_counter()
+            try:
+                updates = watcher.apply(changed)
+            except Exception:
+                print(f'Rebuild failed:\n{traceback.format_exc()}')
+                continue
+            if not updates:
+                continue
+            css_only = updates == ['style.css']
+            hub.publish('css' if css_only else 'reload')
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"  Updated {', '.join(updates)} in {elapsed:.1f} ms")
+    except KeyboardInterrupt:
+        print('\nStopped watching.')
+    finally:
+        server.shutdown()
+
+
+def _header_rules(path: Path) -> dict:
+    """Read per-path response headers from a Netlify/Cloudflare-style _headers file."""
+    rules: dict[str, dict] = {}
+    try:
+        text = path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return rules
+    current = None
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        if not line[0].isspace():
+            current = rules.setdefault(line.strip(), {})
+        elif current is not None and ':' in line:
+            name, value = line.split(':', 1)
+            current[name.strip()] = value.strip()
+    return rules
+
+
+def _accepted_encodings(header: str) -> set:
+    """Content codings an Accept-Encoding header allows, honouring q=0."""
+    accepted = set()
+    for part in header.split(','):
+        coding, *params = [piece.strip() for piece in part.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def _byte_range(header: str, size: int):
+    """Parse a Range header against a file of the given size.
+
+    Returns:
+        Inclusive (start, end) offsets; None if the header should be
+        ignored and the whole file served (malformed or multiple ranges);
+        or False if the range cannot be satisfied.
+    """
+    match = _BYTE_RANGE.fullmatch(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        return (max(size - length, 0), size - 1) if length and size else False
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class StaticSite:
+    """Serves a built site over asyncio the way a production static host would.
+
+    Requests resolve to files under the output directory (directories to
+    their index.html); hidden files, the build manifest and the host
+    configuration files are never served. Each response carries a strong
+    ETag (a hash of the exact bytes sent) and the Cache-Control policy
+    from the site's _headers file. Clients that accept them get the
+    precompressed .br or .gz sibling, and byte ranges of the uncompressed
+    file are supported. Bodies go out through loop.sendfile, which uses
+    the sendfile system call where available.
+    """
+
+    def __init__(self, root: Path, log: bool = True) -> None:
+        self.root = root.absolute()
+        self.log = log
+        self.latencies: list[float] = []
+        self._etags: OrderedDict[Path, tuple] = OrderedDict()
+        self._rules: tuple[dict, int | None] = ({}, None)
+
+    def resolve(self, target: str) -> Path | None:
+        """Map a request target to the file it names, or None."""
+        path = urllib.parse.unquote(urllib.parse.urlsplit(target).path)
+        parts = [part for part in path.split('/') if part]
+        if any(part.startswith('.') or '\\' in part for part in parts):
+            return None
+        if parts in ([generate.HEADERS_FILE], [generate.NGINX_SNIPPET]):
+            return None
+        file = self.root.joinpath(*parts)
+        if file.is_dir():
+            file = file / 'index.html'
+        return file if file.is_file() else None
+
+    def cache_control(self, name: str) -> str:
+        """Cache-Control for an output path, from _headers when the site has one."""
+        headers_path = self.root / generate.HEADERS_FILE
+        try:
+            mtime = headers_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._rules[1]:
+            self._rules = (_header_rules(headers_path), mtime)
+        rules = self._rules[0]
+        rule = rules.get(f'/{name}') or rules.get('/') or {}
+        return rule.get('Cache-Control', SERVE_DEFAULT_CACHE_CONTROL)
+
+    async def etag(self, path: Path, stat: os.stat_result) -> str:
+        """Strong ETag for a file, hashed off the event loop once per version.
+
+        ETags are cached per resolved file, in an LRU of at most
+        SERVE_ETAG_ENTRIES files, and re-hashed when the file changes.
+        """
+        key = path.resolve()
+        version = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        cached = self._etags.get(key)
+        if cached is not None and cached[0] == version:
+            self._etags.move_to_end(key)
+            return cached[1]
+        digest = await asyncio.to_thread(generate.file_digest, path)
+        etag = f'"{digest[:32]}"'
+        self._etags[key] = (version, etag)
+        self._etags.move_to_end(key)
+        while len(self._etags) > SERVE_ETAG_ENTRIES:
+            self._etags.popitem(last=False)
+        return etag
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until it closes or goes idle."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), SERVE_IDLE_TIMEOUT)
+                except (asyncio.TimeoutError, ValueError):
+                    break
+                if not request_line.strip():
+                    break
+                start = time.perf_counter()
+                request = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    request[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._send_head(writer, HTTPStatus.BAD_REQUEST, {'Content-Length': '0'},
+                                          keep_alive=False)
+                    break
+                connection = request.get('connection', '').lower()
+                keep_alive = method in ('GET', 'HEAD') and (
+                    connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive')
+                status, length, encoding = await self.respond(writer, method, target, request,
+                                                              keep_alive)
+                elapsed = (time.perf_counter() - start) * 1000
+                self.latencies.append(elapsed)
+                if self.log:
+                    print(f'  {status.value} {method} {target} {encoding} {length:,} B '
+                          f'{elapsed:.2f} ms')
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer: asyncio.StreamWriter, method: str, target: str,
+                      request: dict, keep_alive: bool) -> tuple:
+        """Answer one request.
+
+        Args:
+            writer: Connection to write the response to.
+            method: Request method.
+            target: Request target (path and query).
+            request: Request headers, with lowercase names.
+            keep_alive: Whether the connection stays open afterwards.
+
+        Returns:
+            Tuple of (HTTPStatus, body bytes sent, content coding).
+        """
+        if method not in ('GET', 'HEAD'):
+            await self._send_head(writer, HTTPStatus.METHOD_NOT_ALLOWED,
+                                  {'Allow': 'GET, HEAD', 'Content-Length': '0'}, keep_alive)
+            return HTTPStatus.METHOD_NOT_ALLOWED, 0, 'identity'
+        path = self.resolve(target)
+        if path is None:
+            body = b'Not Found\n'
+            await self._send_head(writer, HTTPStatus.NOT_FOUND,
+                                  {'Content-Type': 'text/plain; charset=utf-8',
+                                   'Content-Length': str(len(body))}, keep_alive)
+            if method == 'HEAD':
+                return HTTPStatus.NOT_FOUND, 0, 'identity'
+            writer.write(body)
+            await writer.drain()
+            return HTTPStatus.NOT_FOUND, len(body), 'identity'
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript',
+                                                                'application/json'):
+            content_type += '; charset=utf-8'
+        name = path.relative_to(self.root).as_posix()
+        headers = {'Content-Type': content_type, 'Cache-Control': self.cache_control(name),
+                   'Accept-Ranges': 'bytes'}
+        variants = [(coding, path.with_name(path.name + suffix))
+                    for coding, suffix in SERVE_ENCODINGS]
+        variants = [(coding, variant) for coding, variant in variants if variant.is_file()]
+        body_path, encoding = path, 'identity'
+        if variants:
+            headers['Vary'] = 'Accept-Encoding'
+            if 'range' not in request:
+                accepted = _accepted_encodings(request.get('accept-encoding', ''))
+                for coding, variant in variants:
+                    if coding in accepted:
+                        body_path, encoding = variant, coding
+                        headers['Content-Encoding'] = coding
+                        break
+        stat = body_path.stat()
+        etag = headers['ETag'] = await self.etag(body_path, stat)
+        match = request.get('if-none-match')
+        if match and (match.strip() == '*' or etag in (
+                tag.strip().removeprefix('W/') for tag in match.split(','))):
+            del headers['Content-Type']
+            await self._send_head(writer, HTTPStatus.NOT_MODIFIED, headers, keep_alive)
+            return HTTPStatus.NOT_MODIFIED, 0, encoding
+        status = HTTPStatus.OK
+        start, end = 0, stat.st_size - 1
+        if 'range' in request and request.get('if-range', etag) == etag:
+            byte_range = _byte_range(request['range'], stat.st_size)
+            if byte_range is False:
+                await self._send_head(writer, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+                                      {'Content-Range': f'bytes */{stat.st_size}',
+                                       'Content-Length': '0'}, keep_alive)
+                return HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, 0, encoding
+            if byte_range:
+                status = HTTPStatus.PARTIAL_CONTENT
+                start, end = byte_range
+                headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        length = end - start + 1
+        headers['Content-Length'] = str(length)
+        await self._send_head(writer, status, headers, keep_alive)
+        if method == 'HEAD' or not length:
+            return status, 0, encoding
+        with open(body_path, 'rb') as f:
+            await asyncio.get_running_loop().sendfile(writer.transport, f, start, length)
+        return status, length, encoding
+
+    async def _send_head(self, writer: asyncio.StreamWriter, status: HTTPStatus, headers: dict,
+                         keep_alive: bool) -> None:
+        lines = [f'HTTP/1.1 {status.value} {status.phrase}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+
+    async def run(self, host: str, port: int) -> None:
+        """Accept connections until cancelled."""
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def summary(self) -> str:
+        """Request count and latency percentiles so far."""
+        if len(self.latencies) < 2:
+            return f'{len(self.latencies)} requests'
+        cuts = statistics.quantiles(self.latencies, n=100, method='inclusive')
+        return (f'{len(self.latencies):,} requests, latency p50 {cuts[49]:.2f} ms, '
+                f'p90 {cuts[89]:.2f} ms, p99 {cuts[98]:.2f} ms, max {max(self.latencies):.2f} ms')
+
+
+def serve(docs_dir: Path, host: str = '127.0.0.1', port: int = 8000, log: bool = True) -> None:
+    """Serve a built site as a production static host would, until Ctrl+C.
+
+    Args:
+        docs_dir: Output directory to serve.
+        host: Interface to listen on.
+        port: Port to listen on.
+        log: Print one line per request with its status, content coding,
+            size and latency. The latency summary is printed on exit
+            either way.
+    """
+    site = StaticSite(docs_dir, log=log)
+    if site.resolve('/') is None:
+        print(f'Warning: {docs_dir} has no index.html; run "python generate.py" first')
+    print(f'Serving {docs_dir} at http://{host}:{port}/ (Ctrl+C to stop)')
+    try:
+        asyncio.run(site.run(host, port))
+    except KeyboardInterrupt:
+        pass
+    print(f'\nStopped serving: {site.summary()}')